@@ -1,5 +1,6 @@
 # analytics.py
 import math
+from collections import OrderedDict, deque
 import pandas as pd
 import numpy as np
 
@@ -43,16 +44,20 @@ def _stdev_annualized(returns, periods_per_year=252):
         return None
     return float(r.std(ddof=1) * math.sqrt(periods_per_year))
 
-def _beta(asset_returns, market_returns):
-    a = pd.Series(asset_returns).astype(float).align(pd.Series(market_returns).astype(float), join="inner")[0]
-    m = pd.Series(asset_returns).astype(float).align(pd.Series(market_returns).astype(float), join="inner")[1]
-    a, m = a.dropna(), m.dropna()
+def _align_returns(asset_returns, market_returns):
+    a, m = pd.Series(asset_returns).astype(float).align(pd.Series(market_returns).astype(float), join="inner")
+    return a.dropna(), m.dropna()
+
+def _beta_aligned(a, m):
     if len(a) < 2 or len(m) < 2:
         return None
     cov = np.cov(a, m, ddof=1)[0, 1]
     var = np.var(m, ddof=1)
     return float(cov / var) if var != 0 else None
 
+def _beta(asset_returns, market_returns):
+    return _beta_aligned(*_align_returns(asset_returns, market_returns))
+
 def _max_drawdown(price_series):
     p = pd.Series(price_series).astype(float)
     if len(p) == 0:
@@ -62,39 +67,305 @@ def _max_drawdown(price_series):
     return float(dd.min())  # negative number, e.g. -0.23 = -23%
 
 
+class AnalyticsContext:
+    """
+    Memoizes returns, alignments and metrics per price series so stacked
+    decorators share the work instead of each rebuilding a pd.Series.
+
+    Entries are keyed by object identity and hold a reference to the series,
+    so an id cannot be reused while cached. Series are treated as immutable
+    while cached; call clear() after changing one in place. Least recently
+    used entries are evicted beyond maxsize (0 disables memoization).
+
+    Decorators only share a context when one is passed in explicitly, e.g.
+    one per decorator chain; without it every get_metrics() recomputes.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key, refs, compute):
+        entry = self._cache.get(key)
+        if entry is not None and all(a is b for a, b in zip(entry[0], refs)):
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        value = compute()
+        self._cache[key] = (refs, value)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return value
+
+    def returns(self, price_series):
+        return self._get(("returns", id(price_series)), (price_series,),
+                         lambda: _to_returns(price_series))
+
+    def aligned_returns(self, asset_prices, market_prices):
+        return self._get(("aligned", id(asset_prices), id(market_prices)), (asset_prices, market_prices),
+                         lambda: _align_returns(self.returns(asset_prices), self.returns(market_prices)))
+
+    def volatility(self, price_series, periods_per_year=252):
+        return self._get(("vol", id(price_series), periods_per_year), (price_series,),
+                         lambda: _stdev_annualized(self.returns(price_series), periods_per_year=periods_per_year))
+
+    def beta(self, asset_prices, market_prices):
+        return self._get(("beta", id(asset_prices), id(market_prices)), (asset_prices, market_prices),
+                         lambda: _beta_aligned(*self.aligned_returns(asset_prices, market_prices)))
+
+    def max_drawdown(self, price_series):
+        return self._get(("mdd", id(price_series)), (price_series,),
+                         lambda: _max_drawdown(price_series))
+
+    def clear(self):
+        self._cache.clear()
+
+
+# Used by decorators given no context: nothing is kept, every call recomputes
+_NO_CACHE = AnalyticsContext(maxsize=0)
+
+
 class VolatilityDecorator(InstrumentDecorator):
-    def __init__(self, instrument, price_series, periods_per_year=252):
+    def __init__(self, instrument, price_series, periods_per_year=252, context=None):
         super().__init__(instrument)
         self._price_series = price_series
         self._ppy = periods_per_year
+        self._ctx = context if context is not None else _NO_CACHE
 
     def get_metrics(self):
         m = super().get_metrics()
-        ret = _to_returns(self._price_series)
-        m["volatility_ann"] = _stdev_annualized(ret, periods_per_year=self._ppy)
+        m["volatility_ann"] = self._ctx.volatility(self._price_series, periods_per_year=self._ppy)
         return m
 
 
 class BetaDecorator(InstrumentDecorator):
-    def __init__(self, instrument, price_series, market_price_series):
+    def __init__(self, instrument, price_series, market_price_series, context=None):
         super().__init__(instrument)
         self._asset_prices = price_series
         self._market_prices = market_price_series
+        self._ctx = context if context is not None else _NO_CACHE
 
     def get_metrics(self):
         m = super().get_metrics()
-        a_ret = _to_returns(self._asset_prices)
-        m_ret = _to_returns(self._market_prices)
-        m["beta"] = _beta(a_ret, m_ret)
+        m["beta"] = self._ctx.beta(self._asset_prices, self._market_prices)
         return m
 
 
 class DrawdownDecorator(InstrumentDecorator):
-    def __init__(self, instrument, price_series):
+    def __init__(self, instrument, price_series, context=None):
         super().__init__(instrument)
         self._price_series = price_series
+        self._ctx = context if context is not None else _NO_CACHE
+
+    def get_metrics(self):
+        m = super().get_metrics()
+        m["max_drawdown"] = self._ctx.max_drawdown(self._price_series)
+        return m
+
+
+def bulk_risk_metrics(prices, market_prices=None, periods_per_year=252):
+    """
+    Annualized volatility, beta and max drawdown for every column of a
+    time x instrument price matrix, using the same definitions as
+    _stdev_annualized, _beta and _max_drawdown but as NumPy column ops.
+
+    prices is a DataFrame (or 2-D array) with one column per instrument;
+    market_prices is aligned to its index. Returns a DataFrame indexed by
+    instrument with volatility_ann, beta and max_drawdown (NaN where the
+    per-instrument helpers would return None).
+    """
+    if isinstance(prices, pd.DataFrame):
+        columns, index = list(prices.columns), prices.index
+        P = prices.to_numpy(dtype=float)
+    else:
+        P = np.asarray(prices, dtype=float)
+        columns, index = list(range(P.shape[1])), None
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R = P[1:] / P[:-1] - 1.0
+        finite = np.isfinite(R)
+        n = finite.sum(axis=0)
+        R0 = np.where(finite, R, 0.0)
+        mean = R0.sum(axis=0) / n
+        var = (np.where(finite, R - mean, 0.0) ** 2).sum(axis=0) / (n - 1)
+        vol = np.sqrt(var) * math.sqrt(periods_per_year)
+        vol[n < 2] = np.nan
+
+        beta = np.full(len(columns), np.nan)
+        if market_prices is not None:
+            if index is not None and isinstance(market_prices, pd.Series):
+                M = market_prices.reindex(index).to_numpy(dtype=float)
+            else:
+                M = np.asarray(market_prices, dtype=float)
+            if len(M) != len(P):
+                raise ValueError("market_prices must have one price per row of prices.")
+            m = M[1:] / M[:-1] - 1.0
+            both = finite & np.isfinite(m)[:, None]
+            nb = both.sum(axis=0)
+            a = np.where(both, R, 0.0)
+            mm = np.where(both, m[:, None], 0.0)
+            da = np.where(both, a - a.sum(axis=0) / nb, 0.0)
+            dm = np.where(both, mm - mm.sum(axis=0) / nb, 0.0)
+            cov = (da * dm).sum(axis=0) / (nb - 1)
+            var_m = (dm * dm).sum(axis=0) / (nb - 1)
+            beta = np.where((nb >= 2) & (var_m != 0), cov / var_m, np.nan)
+
+        cummax = np.fmax.accumulate(P, axis=0)
+        mdd = np.nanmin(P / cummax - 1.0, axis=0) if len(P) else np.full(len(columns), np.nan)
+
+    return pd.DataFrame({"volatility_ann": vol, "beta": beta, "max_drawdown": mdd}, index=columns)
+
+
+class RiskSheetDecorator(InstrumentDecorator):
+    """Adds the metrics precomputed for this instrument's symbol by bulk_risk_metrics."""
+    def __init__(self, instrument, risk_sheet):
+        super().__init__(instrument)
+        self._sheet = risk_sheet
 
     def get_metrics(self):
         m = super().get_metrics()
-        m["max_drawdown"] = _max_drawdown(self._price_series)
+        if self.symbol in self._sheet.index:
+            for key, value in self._sheet.loc[self.symbol].items():
+                m[key] = None if pd.isna(value) else float(value)
         return m
+
+
+class _StreamStats:
+    """Per-symbol accumulators for StreamingAnalytics."""
+    __slots__ = ("last", "mkt_at_last", "peak", "max_dd", "n", "mean", "m2",
+                 "nb", "mean_a", "mean_m", "c_am", "m2_m", "win", "sums")
+
+    def __init__(self):
+        self.last = None          # last price seen
+        self.mkt_at_last = None   # market price when `last` was seen
+        self.peak = None
+        self.max_dd = None
+        self.n = 0                # Welford: asset returns
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.nb = 0               # Welford: (asset, market) return pairs
+        self.mean_a = 0.0
+        self.mean_m = 0.0
+        self.c_am = 0.0
+        self.m2_m = 0.0
+        self.win = None           # rolling mode: deque of (a, m or None)
+        self.sums = None          # rolling mode: [n, sa, saa, nb, pa, pm, pam, pmm]
+
+
+class StreamingAnalytics:
+    """
+    Live per-symbol volatility, beta and drawdown, updated in O(1) per tick.
+
+    Uses the same definitions as _stdev_annualized, _beta and _max_drawdown:
+    simple returns between consecutive ticks of a symbol, sample (ddof=1)
+    statistics and drawdown against the running peak. With window=None the
+    statistics cover the whole history (Welford updates); with a window they
+    cover the last `window` returns (rolling sums).
+
+    Beta pairs each asset return with the market symbol's move over the same
+    interval (market price now vs. at the asset's previous tick), so feed the
+    market tick before the other symbols of the same timestamp.
+    """
+
+    def __init__(self, market_symbol=None, periods_per_year=252, window=None):
+        self.market_symbol = market_symbol
+        self.periods_per_year = periods_per_year
+        self.window = window
+        self._stats = {}
+        self._market_px = None
+
+    def update(self, tick):
+        px = float(tick.price)
+        if tick.symbol == self.market_symbol:
+            self._market_px = px
+        st = self._stats.get(tick.symbol)
+        if st is None:
+            st = self._stats[tick.symbol] = _StreamStats()
+            if self.window:
+                st.win = deque()
+                st.sums = [0, 0.0, 0.0, 0, 0.0, 0.0, 0.0, 0.0]
+
+        mkt = self._market_px
+        if st.last is not None and st.last != 0:
+            a = px / st.last - 1.0
+            m = None
+            if mkt is not None and st.mkt_at_last:
+                m = mkt / st.mkt_at_last - 1.0
+            if self.window:
+                self._push_window(st, a, m)
+            else:
+                self._push_welford(st, a, m)
+
+        st.last = px
+        st.mkt_at_last = mkt
+        st.peak = px if st.peak is None or px > st.peak else st.peak
+        dd = px / st.peak - 1.0 if st.peak else 0.0
+        st.max_dd = dd if st.max_dd is None or dd < st.max_dd else st.max_dd
+
+    @staticmethod
+    def _push_welford(st, a, m):
+        st.n += 1
+        d = a - st.mean
+        st.mean += d / st.n
+        st.m2 += d * (a - st.mean)
+        if m is not None:
+            st.nb += 1
+            da = a - st.mean_a
+            st.mean_a += da / st.nb
+            dm = m - st.mean_m
+            st.mean_m += dm / st.nb
+            st.c_am += da * (m - st.mean_m)
+            st.m2_m += dm * (m - st.mean_m)
+
+    def _push_window(self, st, a, m):
+        s = st.sums
+        st.win.append((a, m))
+        s[0] += 1; s[1] += a; s[2] += a * a
+        if m is not None:
+            s[3] += 1; s[4] += a; s[5] += m; s[6] += a * m; s[7] += m * m
+        if len(st.win) > self.window:
+            oa, om = st.win.popleft()
+            s[0] -= 1; s[1] -= oa; s[2] -= oa * oa
+            if om is not None:
+                s[3] -= 1; s[4] -= oa; s[5] -= om; s[6] -= oa * om; s[7] -= om * om
+
+    def metrics(self, symbol):
+        """Current volatility_ann, beta, max_drawdown and drawdown for symbol (None until defined)."""
+        st = self._stats.get(symbol)
+        if st is None:
+            return {"volatility_ann": None, "beta": None, "max_drawdown": None, "drawdown": None}
+        if self.window:
+            n, sa, saa, nb, pa, pm, pam, pmm = st.sums
+            var = (saa - sa * sa / n) / (n - 1) if n >= 2 else None
+            cov = (pam - pa * pm / nb) if nb >= 2 else None
+            var_m = (pmm - pm * pm / nb) if nb >= 2 else None
+        else:
+            n, nb = st.n, st.nb
+            var = st.m2 / (n - 1) if n >= 2 else None
+            cov = st.c_am if nb >= 2 else None
+            var_m = st.m2_m if nb >= 2 else None
+        vol = math.sqrt(max(var, 0.0)) * math.sqrt(self.periods_per_year) if var is not None else None
+        beta = cov / var_m if cov is not None and var_m else None
+        return {
+            "volatility_ann": vol,
+            "beta": beta,
+            "max_drawdown": st.max_dd,
+            "drawdown": st.last / st.peak - 1.0 if st.peak else None,
+        }
+
+    def snapshot(self):
+        return {sym: self.metrics(sym) for sym in self._stats}
+
+    def symbol_state(self, symbols):
+        """Accumulators of the given symbols plus the last market price (see Strategy.symbol_state)."""
+        return {"stats": {s: self._stats[s] for s in symbols if s in self._stats},
+                "market_px": self._market_px}
+
+    def merge_symbol_state(self, state):
+        self._stats.update(state["stats"])
+        if state["market_px"] is not None:
+            self._market_px = state["market_px"]
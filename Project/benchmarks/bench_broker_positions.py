@@ -0,0 +1,40 @@
+"""
+Executes 1M orders across 10k symbols against Broker and reports orders/sec.
+
+    python benchmarks/bench_broker_positions.py --orders 1000000 --symbols 10000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import Broker
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", type=int, default=1_000_000)
+    ap.add_argument("--symbols", type=int, default=10_000)
+    args = ap.parse_args()
+
+    rnd = random.Random(0)
+    symbols = [f"SYM{i}" for i in range(args.symbols)]
+    orders = [
+        (rnd.choice(symbols), "BUY" if rnd.random() < 0.55 else "SELL", rnd.randint(1, 3), 100.0)
+        for _ in range(args.orders)
+    ]
+
+    broker = Broker(starting_cash=1_000_000)
+    t0 = time.perf_counter()
+    for sym, side, qty, price in orders:
+        broker.execute_order(sym, side, qty, price)
+    dt = time.perf_counter() - t0
+    print(f"{args.orders} orders over {args.symbols} symbols in {dt:.2f}s "
+          f"({args.orders / dt:,.0f} orders/sec), open positions: {len(broker.root_portfolio.positions)}")
+
+
+if __name__ == "__main__":
+    main()
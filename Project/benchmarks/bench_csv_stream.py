@@ -0,0 +1,70 @@
+"""
+Compares read_csv_to_immutable_list (full list) against iter_csv_ticks (streaming).
+
+Each mode runs in its own subprocess so the peak RSS numbers do not mix.
+
+    python benchmarks/bench_csv_stream.py --rows 2000000
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_loader import read_csv_to_immutable_list, iter_csv_ticks
+from engine import Engine
+from models import Broker
+from patterns.Strategy import MeanReversionStrategy
+
+
+def write_csv(path, rows, n_symbols=50):
+    start = datetime(2025, 1, 1, 9, 30)
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+    px = {s: 100.0 for s in symbols}
+    with open(path, "w", newline="") as f:
+        f.write("timestamp,symbol,price\n")
+        for i in range(rows):
+            s = symbols[i % n_symbols]
+            px[s] *= 1.0 + random.gauss(0, 0.001)
+            f.write(f"{(start + timedelta(seconds=i)).isoformat()},{s},{px[s]:.4f}\n")
+
+
+def run_mode(mode, path):
+    t0 = time.perf_counter()
+    ticks = read_csv_to_immutable_list(path, cache=False) if mode == "list" else iter_csv_ticks(path)
+    engine = Engine(MeanReversionStrategy(), Broker(starting_cash=1_000_000))
+    n = 0
+    for tick in ticks:
+        engine.on_tick(tick)
+        n += 1
+    dt = time.perf_counter() - t0
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{mode:>6}: {n} ticks in {dt:.2f}s ({n / dt:,.0f} ticks/sec), peak RSS {peak_kb / 1024:.1f} MB")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--mode", choices=["list", "stream"])
+    ap.add_argument("--path")
+    args = ap.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.path)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "market_data.csv")
+        write_csv(path, args.rows)
+        for mode in ("list", "stream"):
+            subprocess.run([sys.executable, __file__, "--mode", mode, "--path", path], check=True)
+
+
+if __name__ == "__main__":
+    main()
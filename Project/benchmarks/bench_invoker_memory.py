@@ -0,0 +1,56 @@
+"""
+Peak memory of CommandInvoker history over many orders, unbounded vs bounded.
+
+Each mode runs in its own subprocess. Broker.trades is cleared periodically so
+the numbers reflect the undo history rather than the broker's trade log.
+
+    python benchmarks/bench_invoker_memory.py --orders 10000000 --max-undo 1000
+"""
+import argparse
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import Broker
+from patterns.Command import CommandInvoker, ExecuteOrderCommand
+
+
+def run_mode(orders, max_undo):
+    broker = Broker(starting_cash=1_000_000)
+    invoker = CommandInvoker(max_undo=max_undo)
+    symbols = [f"SYM{i}" for i in range(1000)]
+    t0 = time.perf_counter()
+    for i in range(orders):
+        order = {"timestamp": i, "symbol": symbols[i % 1000], "side": "BUY" if i % 2 else "SELL",
+                 "qty": 1, "price": 100.0}
+        invoker.do(ExecuteOrderCommand(broker, order))
+        if i % 100_000 == 0:
+            broker.trades.clear()
+    dt = time.perf_counter() - t0
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    label = "unbounded" if max_undo is None else f"max_undo={max_undo}"
+    print(f"{label:>16}: {orders} orders in {dt:.1f}s, history={len(invoker.done)}, "
+          f"folded={invoker.checkpoint.n_commands}, peak RSS {peak_kb / 1024:.1f} MB")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--orders", type=int, default=10_000_000)
+    ap.add_argument("--max-undo", type=int, default=1000)
+    ap.add_argument("--mode", choices=["bounded", "unbounded"])
+    args = ap.parse_args()
+
+    if args.mode:
+        run_mode(args.orders, args.max_undo if args.mode == "bounded" else None)
+        return
+    for mode in ("unbounded", "bounded"):
+        subprocess.run([sys.executable, __file__, "--mode", mode, "--orders", str(args.orders),
+                        "--max-undo", str(args.max_undo)], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,42 +1,224 @@
+import heapq
 import json
+import mmap
+import os
 import xml.etree.ElementTree as ET
-from datetime import datetime
+from datetime import datetime, timezone
+from ingest_cache import load_cached
 from models import MarketDataPoint
 import csv
 
+import numpy as np
+import pandas as pd
+
+
 # This parse iso is for the timestamp in Yahoo data.
 def _parse_iso(ts: str) -> datetime:
     """Convert ISO string like '2025-10-01T09:30:00Z' to datetime."""
     return datetime.fromisoformat(ts.replace("Z", "+00:00"))
 
 
+def _snapshot_frame(symbols, prices, timestamps) -> pd.DataFrame:
+    """Columnar get_many result: one row per symbol, timestamps parsed in one vectorized call."""
+    return pd.DataFrame(
+        {
+            "price": np.asarray(prices, dtype=np.float64),
+            "timestamp": pd.to_datetime(list(timestamps), utc=True, format="ISO8601"),
+        },
+        index=pd.Index(list(symbols), name="symbol", dtype=object),
+    )
+
+
 class YahooFinanceAdapter:
     """
     Reads Yahoo Finance JSON data format to MarketDataPoint objects.
+
+    mode="json" (default) loads a single JSON document. mode="jsonl" is for
+    large JSON-lines files (one quote object per line): a symbol -> byte-offset
+    index is built on first open and saved next to the file (index_path,
+    default path + ".idx"), and get_data decodes just that one line through
+    mmap. The index is rebuilt when the file's size or mtime changes.
+    The json mode goes through the ingest cache (cache=False to bypass it).
     """
-    def __init__(self, path: str):
-        with open(path, "r", encoding="utf-8") as f:
-            self._data = json.load(f)
+    MODES = ("json", "jsonl")
 
-    def get_data(self, symbol: str) -> MarketDataPoint | None:
-        if not isinstance(self._data, dict):
+    def __init__(self, path: str, mode: str = "json", index_path: str = None, cache=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self._data = None
+        self._mm = None
+        if mode == "json":
+            self._data = load_cached(path, "json/1", _read_json, cache=cache)
+            return
+        self.index_path = index_path or path + ".idx"
+        self._offsets = self._load_or_build_index()
+        self._f = open(path, "rb")
+        if os.fstat(self._f.fileno()).st_size:
+            self._mm = mmap.mmap(self._f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # ---------- jsonl index ----------
+
+    def _load_or_build_index(self):
+        st = os.stat(self.path)
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+            if index.get("size") == st.st_size and index.get("mtime_ns") == st.st_mtime_ns:
+                return index["offsets"]
+        except (FileNotFoundError, KeyError, ValueError):
+            pass
+        return self._build_index(st)
+
+    def _build_index(self, st):
+        offsets = {}
+        pos = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    ticker = json.loads(line).get("ticker")
+                    if ticker is not None:
+                        offsets[str(ticker)] = (pos, len(line))  # last occurrence wins
+                pos += len(line)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "offsets": offsets}, f)
+        os.replace(tmp, self.index_path)
+        return offsets
+
+    def symbols(self):
+        return list(self._offsets) if self._data is None else [str(self._data.get("ticker"))]
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self.mode == "jsonl" and not self._f.closed:
+            self._f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _record(self, symbol: str):
+        if self._data is not None:
+            if not isinstance(self._data, dict) or str(self._data.get("ticker")) != symbol:
+                return None
+            return self._data
+        hit = self._offsets.get(symbol)
+        if hit is None or self._mm is None:
             return None
-        if str(self._data.get("ticker")) != symbol:
+        start, length = hit
+        return json.loads(self._mm[start:start + length])
+
+    def get_data(self, symbol: str) -> MarketDataPoint | None:
+        record = self._record(symbol)
+        if record is None:
             return None
         return MarketDataPoint(
-            timestamp=_parse_iso(self._data["timestamp"]),
-            symbol=self._data["ticker"],
-            price=float(self._data["last_price"]),
+            timestamp=_parse_iso(record["timestamp"]),
+            symbol=record["ticker"],
+            price=float(record["last_price"]),
         )
 
+    def get_many(self, symbols):
+        """
+        Looks up many symbols at once.
+
+        Returns (frame, missing): a DataFrame indexed by symbol (in request
+        order) with price and timestamp (UTC) columns for the symbols found,
+        and the list of symbols that were not.
+        """
+        found, prices, stamps, missing = [], [], [], []
+        for symbol in dict.fromkeys(symbols):
+            record = self._record(symbol)
+            if record is None:
+                missing.append(symbol)
+                continue
+            found.append(record["ticker"])
+            prices.append(record["last_price"])
+            stamps.append(record["timestamp"])
+        return _snapshot_frame(found, prices, stamps), missing
+
+def _iter_instrument_fields(path: str):
+    """Streams (symbol, price, timestamp) text fields of every <instrument> via ET.iterparse."""
+    root = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != "instrument":
+            continue
+        sym = elem.findtext("symbol")
+        price = elem.findtext("price")
+        ts = elem.findtext("timestamp")
+        if sym and price is not None and ts is not None:
+            yield sym.strip(), price, ts.strip()
+        elem.clear()
+        if elem is not root:
+            root.clear()  # drop the (now empty) child from the wrapper element
+
+
+def iter_bloomberg_xml(path: str):
+    """
+    Streams every <instrument> in a Bloomberg XML file as a MarketDataPoint.
+
+    Uses ET.iterparse and clears each <instrument> (and detaches it from the
+    root) once it has been converted, so memory stays flat for multi-GB files.
+    Works for a single root <instrument> as well as a wrapper element holding many.
+    """
+    for sym, price, ts in _iter_instrument_fields(path):
+        yield MarketDataPoint(timestamp=_parse_iso(ts), symbol=sym, price=float(price))
+
+
+def _bloomberg_index(path: str):
+    # Last occurrence of a symbol wins
+    return {p.symbol: (p.price, p.timestamp) for p in iter_bloomberg_xml(path)}
+
+
 class BloombergXMLAdapter:
     """
     Reads Bloomberg XML data format to MarketDataPoint objects.
+
+    mode="tree" (default) parses the whole document; mode="index" streams the
+    file once and keeps only a symbol -> (price, timestamp) dict; mode="stream"
+    keeps nothing and answers get_data with a streaming scan. iter_data()
+    streams every instrument in any mode. The tree and index modes go
+    through the ingest cache (cache=False to bypass it).
     """
-    def __init__(self, path: str):
-        self._root = ET.parse(path).getroot()
+    MODES = ("tree", "index", "stream")
+
+    def __init__(self, path: str, mode: str = "tree", cache=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode {mode!r}; expected one of {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self._root = None
+        self._index = None
+        if mode == "tree":
+            self._root = load_cached(path, "xml_tree/1", lambda p: ET.parse(p).getroot(), cache=cache)
+        elif mode == "index":
+            self._index = load_cached(path, "xml_index/1", _bloomberg_index, cache=cache)
+
+    def iter_data(self):
+        return iter_bloomberg_xml(self.path)
 
     def get_data(self, symbol: str):
+        if self._index is not None:
+            hit = self._index.get(symbol)
+            if hit is None:
+                return None
+            return MarketDataPoint(timestamp=hit[1], symbol=symbol, price=hit[0])
+        if self._root is None:
+            found = None
+            for point in iter_bloomberg_xml(self.path):
+                if point.symbol == symbol:
+                    found = point
+            return found
         # Directly extract from the root <instrument>
         sym = self._root.findtext("symbol")
         if sym != symbol:
@@ -45,11 +227,81 @@ class BloombergXMLAdapter:
         ts = _parse_iso(self._root.findtext("timestamp"))
         return MarketDataPoint(timestamp=ts, symbol=sym, price=price)
 
+    def get_many(self, symbols):
+        """
+        Looks up many symbols at once; same (frame, missing) result as
+        YahooFinanceAdapter.get_many. In stream mode the file is scanned once
+        for all of them.
+        """
+        wanted = dict.fromkeys(symbols)
+        hits = {}
+        if self._index is not None:
+            hits = {s: self._index[s] for s in wanted if s in self._index}
+        else:
+            if self._root is None:
+                fields = _iter_instrument_fields(self.path)
+            else:
+                fields = [(self._root.findtext("symbol"), self._root.findtext("price"),
+                           self._root.findtext("timestamp"))]
+            for sym, price, ts in fields:
+                if sym in wanted:
+                    hits[sym] = (float(price), ts)  # last occurrence wins
+        found = [s for s in wanted if s in hits]  # request order
+        missing = [s for s in wanted if s not in hits]
+        return _snapshot_frame(found, [hits[s][0] for s in found], [hits[s][1] for s in found]), missing
+
+
+def _read_json(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
-def read_csv_to_immutable_list(csv_file_name):
+def read_instruments(path: str, cache=None) -> list[dict]:
+    """Rows of an instruments CSV as dicts (for InstrumentFactory), via the ingest cache."""
+    def parse(p):
+        with open(p, newline="", encoding="utf-8") as f:
+            return list(csv.DictReader(f))
+    return load_cached(path, "csv_rows/1", parse, cache=cache)
 
-    """The function takes a CSV file path and returns it as a list of MarketDataPoints"""
 
+def _pack_ticks(ticks):
+    """Columnar, fast-to-unpickle form of a tick list for the ingest cache."""
+    stamps = [t.timestamp for t in ticks]
+    if all(type(ts) is datetime and ts.tzinfo is None for ts in stamps):
+        tz = None
+    elif all(type(ts) is datetime and ts.utcoffset() is not None and not ts.utcoffset() for ts in stamps):
+        tz, stamps = "UTC", [ts.replace(tzinfo=None) for ts in stamps]
+    else:
+        return ("list", ticks)
+    symbol_to_id = {}
+    ids = np.fromiter((symbol_to_id.setdefault(t.symbol, len(symbol_to_id)) for t in ticks),
+                      dtype=np.int32, count=len(ticks))
+    prices = np.fromiter((t.price for t in ticks), dtype=np.float64, count=len(ticks))
+    return ("columns", tz, np.array(stamps, dtype="datetime64[us]"), list(symbol_to_id), ids, prices)
+
+
+def _unpack_ticks(packed):
+    if packed[0] == "list":
+        return packed[1]
+    _, tz, stamps, symbols, ids, prices = packed
+    stamps = stamps.astype(object).tolist()
+    if tz is not None:
+        stamps = [ts.replace(tzinfo=timezone.utc) for ts in stamps]
+    return list(map(MarketDataPoint, stamps, [symbols[i] for i in ids.tolist()], prices.tolist()))
+
+
+def read_csv_to_immutable_list(csv_file_name, cache=None):
+
+    """The function takes a CSV file path and returns it as a list of MarketDataPoints.
+
+    Parsed files are kept in the ingest cache in columnar form, so re-reading
+    an unchanged file skips the CSV parse (cache=False to bypass it).
+    """
+
+    return load_cached(csv_file_name, "csv_ticks/1", _parse_csv_list, _pack_ticks, _unpack_ticks, cache=cache)
+
+
+def _parse_csv_list(csv_file_name):
     with open(csv_file_name, newline='') as csvfile:
         reader = csv.DictReader(csvfile)
         price_history = []
@@ -59,4 +311,113 @@ def read_csv_to_immutable_list(csv_file_name):
                 symbol = point['symbol'], 
                 price = float(point['price']))
             price_history.append(market_data_point)
-    return price_history
\ No newline at end of file
+    return price_history
+
+
+def iter_csv_ticks(csv_file_name, chunk_size: int = 1 << 20):
+
+    """Streaming counterpart of read_csv_to_immutable_list.
+
+    Yields MarketDataPoints one at a time while the file is read in
+    chunk_size byte blocks, so memory stays flat regardless of file size.
+    """
+
+    with open(csv_file_name, newline='', buffering=chunk_size) as csvfile:
+        reader = csv.reader(csvfile)
+        header = next(reader, None)
+        if header is None:
+            return
+        i_ts = header.index("timestamp")
+        i_sym = header.index("symbol")
+        i_px = header.index("price")
+        parse_ts = datetime.fromisoformat
+        for row in reader:
+            if not row:
+                continue
+            yield MarketDataPoint(
+                timestamp = parse_ts(row[i_ts]),
+                symbol = row[i_sym],
+                price = float(row[i_px]))
+
+
+_TIE_BREAKS = {
+    "source": lambda tick: 0,            # equal timestamps: earlier source argument first
+    "symbol": lambda tick: tick.symbol,  # equal timestamps: alphabetical, then source
+}
+_DUPLICATE_POLICIES = ("keep", "first", "last", "error")
+
+
+def _merge_ts(ts):
+    """Sort key for a timestamp: aware datetimes in UTC, naive ones taken as UTC."""
+    if isinstance(ts, datetime) and ts.tzinfo is not None:
+        return ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def merge_ticks(*sources, tie_break="source", duplicates="keep"):
+    """
+    Lazily merges already time-sorted tick iterables into one ordered stream.
+
+    Only the head of each source is held (in a heap), so any mix of
+    iter_csv_ticks, BloombergXMLAdapter.iter_data, TickStore.iter_ticks or
+    lists can be passed straight to Engine.run.
+
+    tie_break orders ticks with equal timestamps: "source" (argument order),
+    "symbol", or a callable tick -> sort key (source order breaks any
+    remaining tie). duplicates decides what happens to ticks sharing a
+    timestamp and symbol: "keep" all, keep the "first" or "last" one in
+    tie-break order, or raise ValueError ("error").
+    """
+    if duplicates not in _DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicates policy {duplicates!r}; expected one of {_DUPLICATE_POLICIES}")
+    key = tie_break if callable(tie_break) else _TIE_BREAKS.get(tie_break)
+    if key is None:
+        raise ValueError(f"Unknown tie_break {tie_break!r}; expected one of {tuple(_TIE_BREAKS)} or a callable")
+
+    iterators = [iter(src) for src in sources]
+    last = [None] * len(iterators)
+    heap = []
+
+    def push(i):
+        tick = next(iterators[i], None)
+        if tick is not None:
+            ts = _merge_ts(tick.timestamp)
+            if last[i] is not None and ts < last[i]:
+                raise ValueError(f"Source {i} is not time-sorted at {tick.timestamp!r}")
+            last[i] = ts
+            # (timestamp, tie-break, source) is unique per entry, so ticks are never compared
+            heapq.heappush(heap, (ts, key(tick), i, tick))
+
+    for i in range(len(iterators)):
+        push(i)
+
+    group, group_ts = [], None
+    while heap:
+        ts, _, i, tick = heapq.heappop(heap)
+        push(i)
+        if duplicates == "keep":
+            yield tick
+            continue
+        if group and ts != group_ts:
+            yield from _dedupe(group, duplicates)
+            group = []
+        group_ts = ts
+        group.append(tick)
+    if group:
+        yield from _dedupe(group, duplicates)
+
+
+def _dedupe(group, policy):
+    """Applies the duplicates policy to ticks sharing one timestamp (kept in merge order)."""
+    if len(group) == 1:
+        return group
+    by_symbol = {}
+    for pos, tick in enumerate(group):
+        if tick.symbol in by_symbol:
+            if policy == "error":
+                raise ValueError(f"Duplicate tick for {tick.symbol} at {tick.timestamp!r}")
+            if policy == "first":
+                continue
+        by_symbol[tick.symbol] = pos
+    keep = sorted(by_symbol.values())
+    return [group[pos] for pos in keep]
@@ -1,42 +1,146 @@
 # engine.py
-from models import Broker, MarketDataPoint
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from models import Broker, MarketDataPoint, Position
 from patterns.Strategy import Strategy
-from patterns.Command import ExecuteOrderCommand, CommandInvoker
+from patterns.Command import ExecuteOrderCommand, BatchOrderCommand, CommandInvoker
 
 class Engine:
-    def __init__(self, strategy: Strategy, broker: Broker, publisher=None):
+    def __init__(self, strategy: Strategy, broker: Broker, publisher=None, max_undo: int = None, journal=None,
+                 analytics=None):
         self.strategy = strategy
         self.broker = broker
         self.publisher = publisher
-        self.invoker = CommandInvoker()
+        self.analytics = analytics  # e.g. analytics.StreamingAnalytics, fed every tick
+        self.invoker = CommandInvoker(max_undo=max_undo, journal=journal)
 
     def on_tick(self, tick: MarketDataPoint):
         # Update latest price
         self.broker.update_price(tick)
+        if self.analytics is not None:
+            self.analytics.update(tick)
 
         # Get signals from the strategy
         signals = self.strategy.generate_signals(tick)
 
+        orders = []
         for sig in signals:
             # Notify any observers (logger, alert)
             if self.publisher:
                 self.publisher.notify(sig)
 
-            # Convert signal -> command
-            order = {
+            # Convert signal -> order
+            orders.append({
                 "timestamp": sig["timestamp"],
                 "symbol": sig["symbol"],
                 "side": "BUY" if sig["action"] == "BUY" else "SELL",
                 "qty": sig.get("qty", 1),
                 "price": float(sig["price"]),
-            }
+            })
 
-            cmd = ExecuteOrderCommand(self.broker, order)
-            self.invoker.do(cmd)
+        # One command per tick; several signals go through a single netted batch
+        if len(orders) == 1:
+            self.invoker.do(ExecuteOrderCommand(self.broker, orders[0]))
+        elif orders:
+            self.invoker.do(BatchOrderCommand(self.broker, orders))
 
     def run(self, ticks):
         for tick in ticks:
             self.on_tick(tick)
+        self._flush_publisher()
+
+    def _flush_publisher(self):
+        # Async publishers buffer signals; make sure they are delivered at end of run.
+        flush = getattr(self.publisher, "flush", None)
+        if flush is not None:
+            flush()
+
+    def run_sharded(self, ticks, n_workers: int = None):
+        """
+        Runs the strategy with ticks partitioned by symbol hash across a process pool.
+
+        Every worker gets its own copy of the strategy and a Broker sub-account
+        holding the current positions of its symbols. The sub-accounts are merged
+        back into self.broker, trades and commands in original tick order, and
+        observers are notified afterwards in that same order. Each worker hands
+        back the strategy (and analytics) state of its symbols, which is merged
+        into self.strategy (self.analytics), so consecutive calls continue one
+        session. Analytics beta needs the market symbol's moves, so its ticks
+        are also fed to every other shard's analytics (not its strategy).
+        """
+        n_workers = n_workers or os.cpu_count() or 1
+        market = getattr(self.analytics, "market_symbol", None)
+        shards = [[] for _ in range(n_workers)]
+        shard_of = {}
+        for idx, tick in enumerate(ticks):
+            k = shard_of.get(tick.symbol)
+            if k is None:
+                k = shard_of[tick.symbol] = zlib.crc32(tick.symbol.encode()) % n_workers
+            shards[k].append((idx, tick, True))
+            if tick.symbol == market:
+                for j in range(n_workers):
+                    if j != k:
+                        shards[j].append((idx, tick, False))  # analytics only
+
+        # Seed each sub-account with the open positions of its symbols.
+        seeds = [[] for _ in range(n_workers)]
+        for pos in self.broker.root_portfolio.positions:
+            k = shard_of.get(pos.symbol)
+            if k is not None:
+                seeds[k].append((pos.symbol, pos.quantity, pos.price))
+
+        jobs = [(self.strategy, self.analytics, shards[k], seeds[k]) for k in sorted(set(shard_of.values()))]
+        with ProcessPoolExecutor(max_workers=len(jobs) or 1) as pool:
+            results = list(pool.map(_run_shard, jobs))
+
+        self._merge_shards(results, set(shard_of))
+
+    def _merge_shards(self, results, symbols):
+        broker = self.broker
+        kept, opened = {}, []
+        commands, trades, signals = [], [], []
+        for res in results:
+            broker.cash += res["cash"]
+            broker.last_price.update(res["last_price"])
+            for sym, qty, price, opened_at in res["positions"]:
+                if opened_at is None:
+                    kept[sym] = Position(sym, qty, price)
+                else:
+                    opened.append((opened_at, Position(sym, qty, price)))
+            commands.extend(res["commands"])
+            trades.extend(res["trades"])
+            signals.extend(res["signals"])
+            self.strategy.merge_symbol_state(res["strategy_state"])
+            if self.analytics is not None:
+                self.analytics.merge_symbol_state(res["analytics_state"])
+
+        # Same position order as a single-process run: positions held throughout
+        # keep their slots, ones opened during the run follow in opening order.
+        positions = broker.root_portfolio.positions
+        positions[:] = [p if p.symbol not in symbols else kept[p.symbol]
+                        for p in positions if p.symbol not in symbols or p.symbol in kept]
+        positions.extend(pos for _, pos in sorted(opened, key=lambda item: item[0]))
+        broker._reindex_positions()
+
+        # A tick lives in exactly one shard, so a stable sort on the tick index
+        # restores the single-process order.
+        for items in (commands, trades, signals):
+            items.sort(key=lambda item: item[0])
+
+        broker.trades.extend(trade for _, trade in trades)
+        for _, orders in commands:
+            if len(orders) == 1:
+                cmd = ExecuteOrderCommand(broker, orders[0])
+            else:
+                cmd = BatchOrderCommand(broker, orders)
+            cmd.executed = True
+            self.invoker.record(cmd)
+
+        if self.publisher:
+            for _, sig in signals:
+                self.publisher.notify(sig)
+            self._flush_publisher()
 
     def undo_last(self):
         self.invoker.undo()
@@ -46,3 +150,105 @@ class Engine:
 
     def summary(self):
         print("Engine summary:", self.broker.summary())
+
+
+class MultiStrategyEngine:
+    """
+    Feeds every tick once to N independent engines.
+
+    Each strategy gets its own Engine, and with it its own Broker,
+    CommandInvoker and publisher, so one pass over the data produces N
+    independent summaries.
+    """
+
+    def __init__(self, engines):
+        self.engines = list(engines)
+
+    @classmethod
+    def from_strategies(cls, strategies, starting_cash: float = 0.0, publisher_factory=None):
+        """Builds one Engine per strategy; publisher_factory() is called once per engine if given."""
+        return cls(
+            Engine(s, Broker(starting_cash=starting_cash), publisher_factory() if publisher_factory else None)
+            for s in strategies
+        )
+
+    def on_tick(self, tick: MarketDataPoint):
+        for engine in self.engines:
+            engine.on_tick(tick)
+
+    def run(self, ticks):
+        engines = self.engines
+        for tick in ticks:
+            for engine in engines:
+                engine.on_tick(tick)
+        for engine in engines:
+            engine._flush_publisher()
+
+    def summaries(self):
+        """One broker summary per engine, keyed by strategy class name (suffixed if repeated)."""
+        out = {}
+        for engine in self.engines:
+            name = engine.strategy.__class__.__name__
+            key, i = name, 2
+            while key in out:
+                key, i = f"{name}#{i}", i + 1
+            out[key] = engine.broker.summary()
+        return out
+
+    def summary(self):
+        for name, summ in self.summaries().items():
+            print(f"Engine summary [{name}]:", summ)
+
+
+class _SignalRecorder:
+    """Stands in for the publisher inside a shard worker; collects (tick index, signal) pairs."""
+
+    def __init__(self):
+        self.idx = -1
+        self.signals = []
+
+    def notify(self, signal: dict):
+        self.signals.append((self.idx, signal))
+
+
+def _run_shard(job):
+    strategy, analytics, shard, seed_positions = job
+    broker = Broker(starting_cash=0.0)
+    for sym, qty, price in seed_positions:
+        broker._add_position(Position(sym, qty, price))
+    recorder = _SignalRecorder()
+    engine = Engine(strategy, broker, publisher=recorder, analytics=analytics)
+
+    commands, trades = [], []
+    owned = set()
+    # symbol -> tick index its current position was opened at; seeds held throughout stay absent
+    held = dict(broker._positions)
+    opened_at = {}
+    for idx, tick, own in shard:
+        if not own:
+            analytics.update(tick)  # market tick owned by another shard
+            continue
+        owned.add(tick.symbol)
+        recorder.idx = idx
+        n_done = len(engine.invoker.done)
+        n_trades = len(broker.trades)
+        engine.on_tick(tick)
+        for cmd in engine.invoker.done[n_done:]:
+            commands.append((idx, cmd.orders if isinstance(cmd, BatchOrderCommand) else [cmd.order]))
+        for trade in broker.trades[n_trades:]:
+            trades.append((idx, trade))
+            pos = broker.get_position(trade["symbol"])
+            if pos is not None and pos is not held.get(trade["symbol"]):
+                held[trade["symbol"]] = pos
+                opened_at[trade["symbol"]] = idx
+
+    return {
+        "cash": broker.cash,
+        "last_price": broker.last_price,
+        "positions": [(p.symbol, p.quantity, p.price, opened_at.get(p.symbol)) for p in broker.root_portfolio.positions],
+        "commands": commands,
+        "trades": trades,
+        "signals": recorder.signals,
+        "strategy_state": strategy.symbol_state(owned),
+        "analytics_state": analytics.symbol_state(owned) if analytics is not None else None,
+    }
@@ -0,0 +1,121 @@
+# ingest_cache.py
+import hashlib
+import os
+import pickle
+import stat
+
+_HASH_CHUNK = 1 << 20
+
+
+def default_cache_dir() -> str:
+    """$INGEST_CACHE_DIR, else a per-user directory under $XDG_CACHE_HOME (~/.cache)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.environ.get("INGEST_CACHE_DIR") or os.path.join(base, "ingest_cache")
+
+
+def _file_hash(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _trusted(st) -> bool:
+    """Only unpickle entries this user wrote and nobody else can modify."""
+    if hasattr(os, "getuid") and st.st_uid != os.getuid():
+        return False
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+class IngestCache:
+    """
+    On-disk cache of parsed input files.
+
+    Entries are keyed by the source's absolute path plus a loader "kind"
+    (e.g. "csv_ticks/1"; bump the suffix when a parser's output changes) and
+    remember the source's size, mtime and content hash. An entry is served
+    when size and mtime match, or when only the mtime moved but the content
+    hash still matches; anything else re-parses and replaces the entry.
+    Entries are pickled, optionally through an encode/decode pair that turns
+    the parsed value into a faster binary form (see data_loader).
+
+    cache_dir=None uses default_cache_dir(), a per-user directory, rather
+    than the (possibly shared or read-only) source directory. The directory is
+    created private to the user, and entries owned by another user or
+    writable by others are ignored rather than unpickled. Writing is
+    best-effort: an unwritable cache just means parsing.
+    """
+
+    def __init__(self, cache_dir: str = None, enabled: bool = True):
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def _entry_path(self, path: str, kind: str) -> str:
+        path = os.path.abspath(path)
+        key = hashlib.sha1(f"{kind}\0{path}".encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{os.path.basename(path)}.{key}.bin")
+
+    def load(self, path: str, kind: str, parse, encode=None, decode=None):
+        """Returns parse(path), served from the cache when the source is unchanged."""
+        if not self.enabled:
+            return parse(path)
+        st = os.stat(path)
+        entry = self._entry_path(path, kind)
+        try:
+            with open(entry, "rb") as f:
+                if not _trusted(os.fstat(f.fileno())):
+                    raise OSError("untrusted cache entry")
+                head = pickle.load(f)
+                fresh = head["kind"] == kind and head["size"] == st.st_size and (
+                    head["mtime_ns"] == st.st_mtime_ns or head["hash"] == _file_hash(path))
+                if fresh:
+                    payload = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, KeyError, TypeError, ValueError):
+            fresh = False
+        if fresh:
+            self.hits += 1
+            if head["mtime_ns"] != st.st_mtime_ns:
+                self._store(entry, dict(head, mtime_ns=st.st_mtime_ns), payload)  # skip the hash next time
+            return decode(payload) if decode else payload
+
+        self.misses += 1
+        value = parse(path)
+        digest = _file_hash(path)
+        if os.stat(path).st_mtime_ns == st.st_mtime_ns:  # don't cache a file that changed mid-parse
+            head = {"kind": kind, "size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": digest}
+            self._store(entry, head, encode(value) if encode else value)
+        return value
+
+    def _store(self, entry, head, payload):
+        tmp = f"{entry}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(entry), mode=0o700, exist_ok=True)
+            with open(tmp, "wb") as f:
+                pickle.dump(head, f, protocol=pickle.HIGHEST_PROTOCOL)
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, entry)
+        except OSError:
+            try:
+                os.remove(tmp)
+            except OSError:
+                pass
+
+    def invalidate(self, path: str, kind: str):
+        try:
+            os.remove(self._entry_path(path, kind))
+        except FileNotFoundError:
+            pass
+
+
+# Shared by the loaders; set INGEST_CACHE=0 to turn it off, INGEST_CACHE_DIR to move it.
+DEFAULT_CACHE = IngestCache(enabled=os.environ.get("INGEST_CACHE", "1") != "0")
+
+
+def load_cached(path: str, kind: str, parse, encode=None, decode=None, cache: IngestCache = None):
+    """DEFAULT_CACHE.load unless another cache is given; cache=False bypasses caching."""
+    if cache is False:
+        return parse(path)
+    return (cache or DEFAULT_CACHE).load(path, kind, parse, encode, decode)
@@ -0,0 +1,328 @@
+# journal.py
+import os
+import pickle
+import struct
+import zlib
+from datetime import datetime
+
+from models import Broker, Position
+from patterns.Command import BatchOrderCommand, CommandInvoker, ExecuteOrderCommand, HistoryCheckpoint
+
+# Journal ops
+START, DO, UNDO, REDO = 0, 1, 2, 3
+BATCH_PART, BATCH_END = 4, 5  # a batch "do" is its orders as PART...PART END
+_OPS = {"do": DO, "undo": UNDO, "redo": REDO}
+_SIDES = ("BUY", "SELL")
+
+# Every record is framed as <length, crc32> + body so a torn tail is detected.
+_FRAME = struct.Struct("<II")
+_BODY = struct.Struct("<BBdd")  # op, flags, qty, price
+_SELL, _INT_QTY = 1, 2            # flag bits
+
+
+def _encode(op, order):
+    sym = order["symbol"].encode()
+    ts = order["timestamp"]
+    ts = (ts.isoformat() if isinstance(ts, datetime) else str(ts)).encode()
+    qty = order["qty"]
+    flags = _SIDES.index(order["side"]) | (_INT_QTY if isinstance(qty, int) else 0)
+    body = (_BODY.pack(op, flags, qty, order["price"])
+            + struct.pack("<H", len(sym)) + sym + struct.pack("<H", len(ts)) + ts)
+    return _FRAME.pack(len(body), zlib.crc32(body)) + body
+
+
+def _decode(body):
+    op, flags, qty, price = _BODY.unpack_from(body)
+    if flags & _INT_QTY:
+        qty = int(qty)
+    pos = _BODY.size
+    (n,) = struct.unpack_from("<H", body, pos)
+    sym = body[pos + 2:pos + 2 + n].decode()
+    pos += 2 + n
+    (n,) = struct.unpack_from("<H", body, pos)
+    ts = body[pos + 2:pos + 2 + n].decode()
+    return op, {"timestamp": ts, "symbol": sym, "side": _SIDES[flags & _SELL], "qty": qty, "price": price}
+
+
+def _records(data):
+    """Yields (body, end position) for each intact record, stopping at the first torn or corrupt one."""
+    pos = 0
+    while pos + _FRAME.size <= len(data):
+        length, crc = _FRAME.unpack_from(data, pos)
+        body = data[pos + _FRAME.size:pos + _FRAME.size + length]
+        if len(body) < length or zlib.crc32(body) != crc:
+            break
+        pos += _FRAME.size + length
+        yield body, pos
+
+
+def read_journal(path, offset=0):
+    """Yields (op, order) from offset, stopping at the first torn or corrupt record."""
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    for body, _ in _records(data):
+        yield _decode(body)
+
+
+def _valid_end(path):
+    """
+    Offset just past the last record recovery would apply: the first torn or
+    corrupt record and any unfinished batch before it are cut off.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    end = 0
+    for body, pos in _records(data):
+        if body[0] != BATCH_PART:
+            end = pos
+    return end
+
+
+class CommandJournal:
+    """
+    Append-only write-ahead log of ExecuteOrderCommand activity.
+
+    Pass it to a CommandInvoker (CommandInvoker(journal=...)) and every do,
+    undo and redo is appended as a compact binary record before it runs.
+    Records are buffered and written + fsync'ed every fsync_every records (and
+    on flush/close). Every snapshot_every records the broker and invoker state
+    are written to a snapshot file, so recovery only replays the tail.
+
+    Snapshots stay compact: trades are appended to a ".trades" side file as
+    they accumulate instead of being re-dumped, and an unbounded undo history
+    is cut to its most recent commands (at least undo_window, at most three
+    times that), older ones being folded into the checkpoint. A bounded
+    invoker's own max_undo window is kept as is.
+    """
+
+    def __init__(self, path, broker: Broker, fsync_every: int = 1000, snapshot_every: int = 100_000,
+                 undo_window: int = 10_000):
+        self.path = path
+        self.snapshot_path = path + ".snap"
+        self.trades_path = path + ".trades"
+        self.broker = broker
+        self.fsync_every = fsync_every
+        self.snapshot_every = snapshot_every
+        self.undo_window = undo_window
+        self._trades_written = 0
+        self._checkpoint = None  # invoker checkpoint + done[:_folded], for unbounded invokers
+        self._folded = 0
+        self._low = 0            # shortest undo history seen since the last snapshot
+        if os.path.exists(path):
+            # A crash can leave a torn record (or half a batch) at the end; cut it
+            # off so new records are not appended behind data recovery stops at.
+            end = _valid_end(path)
+            if end < os.path.getsize(path):
+                with open(path, "r+b") as f:
+                    f.truncate(end)
+        self._f = open(path, "ab")
+        self._buf = bytearray()
+        self._pending = 0
+        self._since_snapshot = 0
+        if self._f.tell() == 0:
+            # Fresh journal: side files left over from an earlier run do not apply
+            for stale in (self.snapshot_path, self.trades_path):
+                if os.path.exists(stale):
+                    os.remove(stale)
+            self._buf += _encode(START, {"timestamp": "", "symbol": "", "side": "BUY",
+                                         "qty": 0.0, "price": broker.cash})
+            self.flush()
+        else:
+            # Resuming after recover(): trades up to the last snapshot are on
+            # disk already; drop any written by a snapshot that never completed.
+            trades_offset = 0
+            if os.path.exists(self.snapshot_path):
+                with open(self.snapshot_path, "rb") as f:
+                    state = pickle.load(f)
+                self._trades_written = state["trades_count"]
+                trades_offset = state["trades_offset"]
+            if os.path.exists(self.trades_path):
+                with open(self.trades_path, "r+b") as f:
+                    f.truncate(trades_offset)
+
+    def log(self, op: str, cmd):
+        """Appends a "do" / "undo" / "redo" record for cmd before the invoker applies it."""
+        orders = getattr(cmd, "orders", None)
+        if orders is None:
+            order = getattr(cmd, "order", None)
+            if order is None:
+                return  # only order commands are journaled
+            orders = [order]
+        if op == "do" and isinstance(cmd, BatchOrderCommand):
+            for order in orders[:-1]:
+                self._buf += _encode(BATCH_PART, order)
+            self._buf += _encode(BATCH_END, orders[-1])
+        else:
+            # undo/redo only need the op; the first order is kept for inspection
+            self._buf += _encode(_OPS[op], orders[0])
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.flush()
+
+    def applied(self, invoker):
+        """Called by the invoker once a logged op has run; takes the periodic snapshot."""
+        self._low = min(self._low, len(invoker.done))
+        self._since_snapshot += 1
+        if self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            self.snapshot(invoker)
+
+    def flush(self):
+        if self._buf:
+            self._f.write(self._buf)
+            self._buf.clear()
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self._pending = 0
+
+    def snapshot(self, invoker):
+        """Writes broker + invoker state and the journal offset it covers (atomic replace)."""
+        self.flush()
+        b = self.broker
+        trades_offset = self._write_trades()
+        done, checkpoint = self._undo_window(invoker)
+        state = {
+            "offset": self._f.tell(),
+            "cash": b.cash,
+            "last_price": dict(b.last_price),
+            "positions": [(p.symbol, p.quantity, p.price) for p in b.root_portfolio.positions],
+            "trades_count": self._trades_written,
+            "trades_offset": trades_offset,
+            "max_undo": invoker.max_undo,
+            "done": [_snapshot_entry(c) for c in done],
+            "undone": [_snapshot_entry(c) for c in invoker.undone],
+            "checkpoint": checkpoint.as_dict(),
+        }
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        self._since_snapshot = 0
+
+    def _write_trades(self):
+        """Appends trades made since the last snapshot to the side file; returns its size."""
+        new = self.broker.trades[self._trades_written:]
+        with open(self.trades_path, "ab") as f:
+            if new:
+                pickle.dump(new, f, protocol=pickle.HIGHEST_PROTOCOL)
+                f.flush()
+                os.fsync(f.fileno())
+            self._trades_written += len(new)
+            return f.tell()
+
+    def _undo_window(self, invoker):
+        """(commands to snapshot, checkpoint covering the rest); folding is incremental."""
+        if invoker.max_undo is not None:
+            return list(invoker.done), invoker.checkpoint
+        done, window = invoker.done, self.undo_window
+        if (self._checkpoint is None or self._low < self._folded
+                or (self._folded and len(done) - self._folded < window)):
+            # First snapshot, or undo reached into (or near) the folded commands: refold
+            self._checkpoint = _copy_checkpoint(invoker.checkpoint)
+            self._folded = 0
+        if len(done) - self._folded > 3 * window:
+            # Fold down to twice the window, so a few undos don't force a refold
+            target = len(done) - 2 * window
+            for cmd in done[self._folded:target]:
+                cmd.fold_into(self._checkpoint)
+            self._folded = target
+        self._low = len(done)
+        return done[self._folded:], self._checkpoint
+
+    def close(self):
+        self.flush()
+        self._f.close()
+
+
+def _copy_checkpoint(checkpoint):
+    copy = HistoryCheckpoint()
+    copy.n_commands = checkpoint.n_commands
+    copy.cash_delta = checkpoint.cash_delta
+    copy.net_qty = dict(checkpoint.net_qty)
+    return copy
+
+
+def _read_trades(path, count, offset):
+    trades = []
+    if count:
+        with open(path, "rb") as f:
+            while f.tell() < offset:
+                trades.extend(pickle.load(f))
+    return trades[:count]
+
+
+def _snapshot_entry(cmd):
+    """("batch", orders) or ("order", order) for snapshots."""
+    if isinstance(cmd, BatchOrderCommand):
+        return ("batch", cmd.orders)
+    return ("order", cmd.order)
+
+
+def _command(broker, entry):
+    kind, payload = entry
+    if kind == "batch":
+        return BatchOrderCommand(broker, payload)
+    return ExecuteOrderCommand(broker, payload)
+
+
+def recover(path, max_undo: int = None):
+    """
+    Rebuilds (broker, invoker) from a journal and its snapshot, if any.
+
+    Starts from the latest snapshot and replays only the journal records
+    written after it (a batch cut off by the crash is dropped whole),
+    applying orders straight to the Broker instead of re-running the
+    strategy. Order timestamps come back as strings. Undo history beyond the
+    journal's undo window comes back folded into invoker.checkpoint. Last
+    prices are market data, not commands, so they are only restored as of the
+    snapshot; feed fresh ticks through Broker.update_price before relying on
+    equity().
+    """
+    snap_path = path + ".snap"
+    offset = 0
+    broker = None
+    invoker = CommandInvoker(max_undo=max_undo)
+
+    if os.path.exists(snap_path):
+        with open(snap_path, "rb") as f:
+            state = pickle.load(f)
+        offset = state["offset"]
+        broker = Broker(starting_cash=state["cash"])
+        broker.last_price.update(state["last_price"])
+        for sym, qty, price in state["positions"]:
+            broker._add_position(Position(sym, qty, price))
+        broker.trades = _read_trades(path + ".trades", state["trades_count"], state["trades_offset"])
+        invoker = CommandInvoker(max_undo=state["max_undo"])
+        for orders in state["done"]:
+            cmd = _command(broker, orders)
+            cmd.executed = True
+            invoker.done.append(cmd)
+        invoker.undone = [_command(broker, orders) for orders in state["undone"]]
+        cp = state["checkpoint"]
+        invoker.checkpoint.n_commands = cp["n_commands"]
+        invoker.checkpoint.cash_delta = cp["cash_delta"]
+        invoker.checkpoint.net_qty = dict(cp["net_qty"])
+
+    batch = []
+    for op, order in read_journal(path, offset):
+        if op == BATCH_PART:
+            batch.append(order)
+        elif op == BATCH_END:
+            batch.append(order)
+            invoker.do(BatchOrderCommand(broker, batch))
+            batch = []
+        elif op == START:
+            if broker is None:
+                broker = Broker(starting_cash=order["price"])
+        elif op == DO:
+            invoker.do(ExecuteOrderCommand(broker, order))
+        elif op == UNDO:
+            invoker.undo()
+        elif op == REDO:
+            invoker.redo()
+
+    if broker is None:
+        broker = Broker()
+    return broker, invoker
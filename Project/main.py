@@ -1,25 +1,22 @@
 from patterns.Factory import InstrumentFactory
 from patterns.Builder import PortfolioBuilder
-from data_loader import YahooFinanceAdapter, BloombergXMLAdapter, read_csv_to_immutable_list
+from data_loader import YahooFinanceAdapter, BloombergXMLAdapter, read_instruments
+from tick_store import iter_cached_ticks
 from models import Broker, Stock
 from patterns.Strategy import BreakoutStrategy, MeanReversionStrategy
 from patterns.Observer import SignalPublisher
 from reporting import LoggerObserver, AlertObserver
 from patterns.Command import ExecuteOrderCommand, CommandInvoker
-from analytics import VolatilityDecorator, BetaDecorator, DrawdownDecorator
+from analytics import AnalyticsContext, VolatilityDecorator, BetaDecorator, DrawdownDecorator
 import pandas as pd
 
 # Testing the factory
 print("----------------------------------------------------------")
 print("Testing the factory.")
 print("----------------------------------------------------------")
-import csv
-
-with open("Project/data/instruments.csv", newline="", encoding="utf-8") as f:
-    reader = csv.DictReader(f)
-    for row in list(reader):
-        instrument = InstrumentFactory.create_instrument(row)
-        print(instrument)
+for row in read_instruments("Project/data/instruments.csv"):
+    instrument = InstrumentFactory.create_instrument(row)
+    print(instrument)
 
 print("----------------------------------------------------------")
 print("Testing the builder.")
@@ -37,7 +34,9 @@ market_prices = pd.Series([100, 100, 101, 101, 102, 103, 104, 104])
 
 wm = Stock(symbol="WM", price=asset_prices.iloc[-1], issuer="Waste Management Inc.", sector="Industrial")
 
-decorated = DrawdownDecorator(BetaDecorator(VolatilityDecorator(wm, asset_prices, periods_per_year=12), asset_prices, market_prices),asset_prices)
+# One context per chain, so the stacked decorators share returns/alignments
+ctx = AnalyticsContext()
+decorated = DrawdownDecorator(BetaDecorator(VolatilityDecorator(wm, asset_prices, periods_per_year=12, context=ctx), asset_prices, market_prices, context=ctx), asset_prices, context=ctx)
 
 print(decorated.get_metrics())
 print("----------------------------------------------------------")
@@ -68,15 +67,19 @@ for sub_name, sub in portfolio.sub_portfolios.items():
 print("----------------------------------------------------------")
 print("Testing the strategy interchangeability and signal generation.")
 print("----------------------------------------------------------")
-ticks = read_csv_to_immutable_list("Project/data/market_data.csv")
+MARKET_DATA_FILE = "Project/data/market_data.csv"
 strategies = [BreakoutStrategy(), MeanReversionStrategy()]
 
+# One pass over the data feeds every strategy, instead of re-reading it per strategy.
+# Later runs stream the ticks from the columnar store in the ingest cache.
+signals_by_strategy = {strat: [] for strat in strategies}
+for tick in iter_cached_ticks(MARKET_DATA_FILE):
+    for strat in strategies:
+        signals_by_strategy[strat].extend(strat.generate_signals(tick))
+
 for strat in strategies:
     print(f"\nUsing strategy: {strat.__class__.__name__}")
-    signals = []
-    for tick in ticks:
-        new_signals = strat.generate_signals(tick)
-        signals.extend(new_signals)
+    signals = signals_by_strategy[strat]
 
     if signals:
         for s in signals[:5]: 
@@ -94,7 +97,7 @@ alert = AlertObserver(min_notional=500)
 
 print("Attaching observers...")
 pub.attach(logger)
-pub.attach(alert)
+pub.attach(alert, min_notional=alert.min_notional)  # publisher skips it for small trades
 
 # Send small and large signals
 pub.notify({"timestamp": "t5", "symbol": "AAPL", "action": "BUY", "price": 50, "qty": 5})
@@ -4,6 +4,9 @@ from datetime import datetime, date
 import pandas as pd 
 from typing import List, Dict
 from abc import ABC, abstractmethod
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass(frozen=True)
@@ -57,17 +60,23 @@ class PortfolioComponent(ABC):
     def get_positions(self):
         pass
 
-@dataclass
+@dataclass(eq=False)  # no annotated fields, so a generated __eq__ would make every Position equal
 class Position(PortfolioComponent):
     symbol = None
     quantity = 0
     price = 0
+    _parent = None  # owning Portfolio, told when quantity/price change
 
     def __init__(self, symbol, quantity, price):
         self.symbol = symbol
         self.quantity = quantity
         self.price = price
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in ("quantity", "price") and self._parent is not None:
+            self._parent.invalidate()
+
     def value(self):
         """Helper method — not part of the interface, just a convenience."""
         return self.quantity * self.price
@@ -84,36 +93,86 @@ class Portfolio(PortfolioComponent):
     owner: str = None
     positions: list = field(default_factory=list)
     sub_portfolios: dict = field(default_factory=dict)
+    # Cached aggregates; a change below a node marks the path up to the root dirty.
+    _parent: "Portfolio" = field(default=None, init=False, repr=False, compare=False)
+    _value: float = field(default=None, init=False, repr=False, compare=False)
+    _all_positions: list = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for p in self.positions:
+            object.__setattr__(p, "_parent", self)
+        for sp in self.sub_portfolios.values():
+            sp._parent = self
+
+    def invalidate(self):
+        """Drops the cached value/positions here and on every ancestor (O(depth))."""
+        # A node with nothing cached has no cached ancestors either, so stop there.
+        node = self
+        while node is not None and (node._value is not None or node._all_positions is not None):
+            node._value = None
+            node._all_positions = None
+            node = node._parent
 
     def add_position(self, position):
         self.positions.append(position)
+        object.__setattr__(position, "_parent", self)
+        self.invalidate()
 
     def add_subportfolio(self, sub):
         self.sub_portfolios[sub.name] = sub
+        sub._parent = self
+        self.invalidate()
 
     def get_value(self):
-        total = sum(p.get_value() for p in self.positions)
-        total += sum(sp.get_value() for sp in self.sub_portfolios.values())
-        return total
+        if self._value is None:
+            total = sum(p.get_value() for p in self.positions)
+            total += sum(sp.get_value() for sp in self.sub_portfolios.values())
+            self._value = total
+        return self._value
 
     def get_positions(self):
-        out = list(self.positions)
-        for sp in self.sub_portfolios.values():
-            out.extend(sp.get_positions())
-        return out
+        """Flattened positions of the whole subtree. The list is cached, so treat it as read-only."""
+        if self._all_positions is None:
+            out = list(self.positions)
+            for sp in self.sub_portfolios.values():
+                out.extend(sp.get_positions())
+            self._all_positions = out
+        return self._all_positions
 
 
 class Broker:
     """Handles cash, positions, and trade execution."""
 
-    def __init__(self, starting_cash: float = 0.0):
+    def __init__(self, starting_cash: float = 0.0, reconcile_every: int = 100_000, drift_tol: float = 1e-6):
         self.cash = float(starting_cash)
         self.last_price: Dict[str, float] = {}
         self.root_portfolio = Portfolio(name="MainPortfolio")
         self.trades = []
+        # symbol -> open Position (same objects as root_portfolio.positions) for O(1) lookups
+        self._positions: Dict[str, Position] = {}
+        # Running sum of quantity * mark price over open positions, so equity() is O(1).
+        self._market_value = 0.0
+        self.reconcile_every = reconcile_every
+        self.drift_tol = drift_tol
+        self.max_drift = 0.0
+        self._updates = 0
+
+    def _mark(self, pos: Position) -> float:
+        return self.last_price.get(pos.symbol, pos.price)
+
+    def _tick_reconcile(self):
+        self._updates += 1
+        if self.reconcile_every and self._updates >= self.reconcile_every:
+            self.reconcile()
 
     def update_price(self, tick: MarketDataPoint):
-        self.last_price[tick.symbol] = tick.price
+        pos = self._positions.get(tick.symbol)
+        if pos is not None:
+            self._market_value += pos.quantity * (tick.price - self._mark(pos))
+            self.last_price[tick.symbol] = tick.price
+            self._tick_reconcile()
+        else:
+            self.last_price[tick.symbol] = tick.price
 
     def execute_order(self, symbol: str, side: str, qty: float, price: float):
         """Executes a simple market order and updates the portfolio."""
@@ -125,26 +184,108 @@ class Broker:
             self._adjust_position(symbol, -qty, price)
 
         self.trades.append({"symbol": symbol, "side": side, "qty": qty, "price": price})
+        self._tick_reconcile()
+
+    def execute_batch(self, orders):
+        """
+        Executes a group of order dicts with one position update per symbol.
+
+        Same-symbol orders are netted first; the position takes the net
+        quantity change and the last fill price. Every order still gets its
+        own entry in self.trades.
+        """
+        net = {}
+        cash_delta = 0.0
+        trades = self.trades
+        for o in orders:
+            symbol, side, qty, price = o["symbol"], o["side"], o["qty"], o["price"]
+            if side == "BUY":
+                cash_delta -= price * qty
+                delta = qty
+            elif side == "SELL":
+                cash_delta += price * qty
+                delta = -qty
+            else:
+                delta = 0
+            prev = net.get(symbol)
+            net[symbol] = (delta if prev is None else prev[0] + delta, price)
+            trades.append({"symbol": symbol, "side": side, "qty": qty, "price": price})
+
+        self.cash += cash_delta
+        for symbol, (delta, price) in net.items():
+            if delta or symbol in self._positions:
+                self._adjust_position(symbol, delta, price)
+        self._tick_reconcile()
+
+    def get_position(self, symbol: str):
+        """Returns the open Position for symbol, or None."""
+        return self._positions.get(symbol)
+
+    def _add_position(self, pos: Position):
+        self._positions[pos.symbol] = pos
+        self.root_portfolio.add_position(pos)
+        self._market_value += pos.quantity * self._mark(pos)
+
+    def _remove_position(self, symbol: str):
+        """
+        Removes symbol's position. The others keep their order, so
+        root_portfolio.positions and summary() stay in opening order.
+        """
+        gone = self._positions.pop(symbol, None)
+        if gone is None:
+            return
+        self._market_value -= gone.quantity * self._mark(gone)
+        positions = self.root_portfolio.positions
+        del positions[next(i for i, p in enumerate(positions) if p is gone)]
+        self.root_portfolio.invalidate()
+
+    def _reindex_positions(self):
+        """Resyncs the symbol index and market value after root_portfolio.positions was edited directly."""
+        root = self.root_portfolio
+        for p in root.positions:
+            object.__setattr__(p, "_parent", root)
+        self._positions = {p.symbol: p for p in root.positions}
+        root.invalidate()
+        self._market_value = self._full_market_value()
 
     def _adjust_position(self, symbol: str, delta_qty: float, price: float):
         """Update or create a position in the root portfolio."""
-        pos = next((p for p in self.root_portfolio.positions if p.symbol == symbol), None)
+        pos = self.get_position(symbol)
         if pos:
+            before = pos.quantity * self._mark(pos)
             pos.quantity += delta_qty
             pos.price = price
+            self._market_value += pos.quantity * self._mark(pos) - before
             if abs(pos.quantity) < 1e-9:  # flat
-                self.root_portfolio.positions.remove(pos)
+                self._remove_position(symbol)
         else:
             if delta_qty > 0:
-                self.root_portfolio.add_position(Position(symbol, delta_qty, price))
+                self._add_position(Position(symbol, delta_qty, price))
 
-    def equity(self):
-        # Total = cash + portfolio value using last prices
+    def _full_market_value(self) -> float:
         port_value = 0
         for pos in self.root_portfolio.positions:
-            price = self.last_price.get(pos.symbol, pos.price)
-            port_value += pos.quantity * price
-        return self.cash + port_value
+            port_value += pos.quantity * self._mark(pos)
+        return port_value
+
+    def reconcile(self) -> float:
+        """
+        Recomputes the market value from scratch, resyncs the running total and
+        returns the floating-point drift that had built up. Called automatically
+        every reconcile_every price updates / fills.
+        """
+        full = self._full_market_value()
+        drift = self._market_value - full
+        self._market_value = full
+        self._updates = 0
+        self.max_drift = max(self.max_drift, abs(drift))
+        if abs(drift) > self.drift_tol * max(1.0, abs(full)):
+            logger.warning("Broker market value drifted by %.3g before reconcile", drift)
+        return drift
+
+    def equity(self):
+        # Total = cash + running portfolio value using last prices
+        return self.cash + self._market_value
 
     def summary(self):
         return {
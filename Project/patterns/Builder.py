@@ -1,3 +1,4 @@
+from ingest_cache import load_cached
 from models import Portfolio, Position
 import json
 
@@ -54,7 +55,12 @@ class PortfolioBuilder:
         return builder
 
     @staticmethod
-    def from_json(path):
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+    def from_json(path, cache=None):
+        # The parsed JSON comes from the ingest cache when the file is unchanged
+        data = load_cached(path, "json/1", _read_json, cache=cache)
         return PortfolioBuilder.from_dict(data).build()
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -1,8 +1,39 @@
+from collections import deque
+
+
 class Command:
     def execute(self):
         pass
     def undo(self):
         pass
+    def fold_into(self, checkpoint):
+        """Adds this command's lasting effect to a HistoryCheckpoint once it leaves undo history."""
+        checkpoint.n_commands += 1
+
+
+class HistoryCheckpoint:
+    """
+    Compact stand-in for commands that fell out of a bounded undo history.
+
+    Holds the net effect of every folded command (cash change and net
+    quantity per symbol) rather than the commands themselves, so its size
+    depends on the number of symbols, not the number of orders.
+    """
+
+    def __init__(self):
+        self.n_commands = 0
+        self.cash_delta = 0.0
+        self.net_qty = {}
+
+    def add_order(self, order):
+        sign = 1 if order["side"] == "BUY" else -1
+        qty = order["qty"]
+        self.cash_delta -= sign * qty * order["price"]
+        sym = order["symbol"]
+        self.net_qty[sym] = self.net_qty.get(sym, 0) + sign * qty
+
+    def as_dict(self):
+        return {"n_commands": self.n_commands, "cash_delta": self.cash_delta, "net_qty": dict(self.net_qty)}
 
 class ExecuteOrderCommand(Command):
     def __init__(self, broker, order):
@@ -22,8 +53,7 @@ class ExecuteOrderCommand(Command):
 
     def undo(self):
         if self.executed:
-            reverse = dict(self.order)
-            reverse["side"] = "SELL" if self.order["side"] == "BUY" else "BUY"
+            reverse = _reverse(self.order)
             self.broker.execute_order(
                 reverse["symbol"],
                 reverse["side"],
@@ -32,24 +62,100 @@ class ExecuteOrderCommand(Command):
             )
             self.executed = False
 
+    def fold_into(self, checkpoint):
+        super().fold_into(checkpoint)
+        if self.executed:
+            checkpoint.add_order(self.order)
+
+
+def _reverse(order):
+    reverse = dict(order)
+    reverse["side"] = "SELL" if order["side"] == "BUY" else "BUY"
+    return reverse
+
+
+class BatchOrderCommand(Command):
+    """
+    Executes a vector of orders in one Broker call and one undo entry.
+    Orders for the same symbol are netted before they reach the position.
+    """
+    def __init__(self, broker, orders):
+        self.broker = broker
+        self.orders = list(orders)
+        self.executed = False
+
+    def execute(self):
+        if not self.executed:
+            self.broker.execute_batch(self.orders)
+            self.executed = True
+
+    def undo(self):
+        if self.executed:
+            self.broker.execute_batch([_reverse(o) for o in self.orders])
+            self.executed = False
+
+    def fold_into(self, checkpoint):
+        super().fold_into(checkpoint)
+        if self.executed:
+            for order in self.orders:
+                checkpoint.add_order(order)
+
 class CommandInvoker:
-    def __init__(self):
-        self.done = []
+    def __init__(self, max_undo: int = None, journal=None):
+        """
+        max_undo=None keeps every command (unbounded undo). With a limit, only
+        the last max_undo commands stay undoable; older ones are folded into
+        self.checkpoint so memory stays constant over long runs.
+
+        journal (a journal.CommandJournal) gets every do/undo/redo logged
+        before it is applied, for crash recovery.
+        """
+        self.max_undo = max_undo
+        self.journal = journal
+        self.done = [] if max_undo is None else deque()
         self.undone = []
+        self.checkpoint = HistoryCheckpoint()
+
+    def _push(self, cmd: Command):
+        self.done.append(cmd)
+        if self.max_undo is not None:
+            while len(self.done) > self.max_undo:
+                self.done.popleft().fold_into(self.checkpoint)
 
     def do(self, cmd: Command):
+        if self.journal:
+            self.journal.log("do", cmd)
         cmd.execute()
-        self.done.append(cmd)
+        self._push(cmd)
+        self.undone.clear()
+        if self.journal:
+            self.journal.applied(self)
+
+    def record(self, cmd: Command):
+        """Adds a command that was already executed elsewhere to the history."""
+        if self.journal:
+            self.journal.log("do", cmd)
+        self._push(cmd)
         self.undone.clear()
+        if self.journal:
+            self.journal.applied(self)
 
     def undo(self):
         if self.done:
             cmd = self.done.pop()
+            if self.journal:
+                self.journal.log("undo", cmd)
             cmd.undo()
             self.undone.append(cmd)
+            if self.journal:
+                self.journal.applied(self)
 
     def redo(self):
         if self.undone:
             cmd = self.undone.pop()
+            if self.journal:
+                self.journal.log("redo", cmd)
             cmd.execute()
-            self.done.append(cmd)
+            self._push(cmd)
+            if self.journal:
+                self.journal.applied(self)
@@ -1,4 +1,9 @@
 from abc import ABC, abstractmethod
+from bisect import bisect_right
+from collections import deque
+import logging
+from operator import itemgetter
+import threading
 
 class Observer(ABC):
     """Defines the interface for all observers."""
@@ -8,19 +13,218 @@ class Observer(ABC):
 
 
 class SignalPublisher:
-    """Publishes trading signals to attached observers."""
+    """
+    Publishes trading signals to attached observers.
+
+    Observers may subscribe with filters (symbols, actions, min_notional). The
+    publisher keeps them indexed by (symbol, action), with None as wildcard, and
+    each index bucket sorted by min_notional, so notify() only touches observers
+    that match instead of every subscriber.
+    """
 
     def __init__(self):
         self._observers = []
+        self._index = {}  # (symbol | None, action | None) -> ([min_notional...], [(seq, observer)...])
+        self._subs = {}   # id(observer) -> index keys it lives under
+        self._seq = 0
 
-    def attach(self, observer: Observer):
-        if observer not in self._observers:
-            self._observers.append(observer)
+    def attach(self, observer: Observer, symbols=None, actions=None, min_notional=None):
+        if observer in self._observers:
+            return
+        self._observers.append(observer)
+
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        if isinstance(actions, str):
+            actions = [actions]
+        syms = [None] if symbols is None else list(dict.fromkeys(symbols))
+        acts = [None] if actions is None else list(dict.fromkeys(a.upper() for a in actions))
+        threshold = float("-inf") if min_notional is None else float(min_notional)
+
+        keys = []
+        for sym in syms:
+            for act in acts:
+                thresholds, subs = self._index.setdefault((sym, act), ([], []))
+                i = bisect_right(thresholds, threshold)
+                thresholds.insert(i, threshold)
+                subs.insert(i, (self._seq, observer))
+                keys.append((sym, act))
+        self._subs[id(observer)] = keys
+        self._seq += 1
 
     def detach(self, observer: Observer):
         if observer in self._observers:
             self._observers.remove(observer)
+            for key in self._subs.pop(id(observer)):
+                thresholds, subs = self._index[key]
+                i = next(i for i, (_, o) in enumerate(subs) if o is observer)
+                del thresholds[i]
+                del subs[i]
+                if not subs:
+                    del self._index[key]
+
+    def _matching(self, signal: dict):
+        """Observers interested in signal, in attach order."""
+        sym = signal.get("symbol")
+        act = signal.get("action")
+        notional = None
+        hits = []
+        for key in dict.fromkeys(((sym, act), (sym, None), (None, act), (None, None))):
+            bucket = self._index.get(key)
+            if bucket is None:
+                continue
+            thresholds, subs = bucket
+            if thresholds[-1] == float("-inf"):
+                hi = len(subs)
+            else:
+                if notional is None:
+                    notional = signal.get("qty", 1) * float(signal["price"])
+                hi = bisect_right(thresholds, notional)
+            if hi:
+                hits.extend(subs[:hi])
+        if len(hits) > 1:
+            hits.sort(key=itemgetter(0))
+        return [o for _, o in hits]
 
     def notify(self, signal: dict):
-        for observer in self._observers:
+        for observer in self._matching(signal):
             observer.update(signal)
+
+    def flush(self):
+        """Nothing is buffered when dispatching inline."""
+        pass
+
+
+class _ObserverChannel:
+    """Bounded queue plus worker thread that feeds one observer."""
+
+    def __init__(self, observer, maxsize, policy, coalesce_key):
+        self.observer = observer
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesce_key = coalesce_key
+        self.dropped = 0
+        self._q = deque()          # entries are [key, signal]
+        self._pending = {}         # coalesce key -> queued entry
+        self._busy = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._drain, name=f"observer-{observer.__class__.__name__}", daemon=True)
+        self._thread.start()
+
+    def put(self, signal: dict):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Publisher channel is closed.")
+            key = self.coalesce_key(signal) if self.policy == "coalesce" else None
+            if key is not None and key in self._pending:
+                self._pending[key][1] = signal  # replace the queued signal in place
+                return
+            while len(self._q) >= self.maxsize:
+                if self.policy == "block":
+                    self._cond.wait()
+                else:
+                    old_key, _ = self._q.popleft()
+                    self._pending.pop(old_key, None)
+                    self.dropped += 1
+            entry = [key, signal]
+            self._q.append(entry)
+            if key is not None:
+                self._pending[key] = entry
+            self._cond.notify_all()
+
+    def _drain(self):
+        while True:
+            with self._cond:
+                while not self._q and not self._closed:
+                    self._cond.wait()
+                if not self._q:
+                    return
+                key, signal = self._q.popleft()
+                if key is not None:
+                    self._pending.pop(key, None)
+                self._busy += 1
+                self._cond.notify_all()
+            try:
+                self.observer.update(signal)
+            except Exception:
+                logging.exception("Observer %s failed on signal", self.observer.__class__.__name__)
+            finally:
+                with self._cond:
+                    self._busy -= 1
+                    self._cond.notify_all()
+
+    def flush(self):
+        with self._cond:
+            while self._q or self._busy:
+                self._cond.wait()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+class AsyncSignalPublisher(SignalPublisher):
+    """
+    Non-blocking publisher: notify() only enqueues, and one worker thread per
+    observer calls update() off the engine thread.
+
+    policy decides what happens when an observer's queue (maxsize) is full:
+      - "block":       notify() waits for room
+      - "drop_oldest": the oldest queued signal is discarded
+      - "coalesce":    a signal replaces one still queued with the same
+                       coalesce_key (default: symbol); otherwise drop-oldest
+    flush() waits until everything queued has been delivered; close() flushes
+    and stops the workers. Use it as a context manager to close at end of run.
+    """
+
+    POLICIES = ("block", "drop_oldest", "coalesce")
+
+    def __init__(self, maxsize: int = 10_000, policy: str = "block", coalesce_key=None):
+        super().__init__()
+        if policy not in self.POLICIES:
+            raise ValueError(f"Unknown backpressure policy: {policy}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.policy = policy
+        self.coalesce_key = coalesce_key or (lambda signal: signal.get("symbol"))
+        self._channels = {}
+
+    def attach(self, observer: Observer, symbols=None, actions=None, min_notional=None):
+        if observer not in self._observers:
+            super().attach(observer, symbols=symbols, actions=actions, min_notional=min_notional)
+            self._channels[id(observer)] = _ObserverChannel(observer, self.maxsize, self.policy, self.coalesce_key)
+
+    def detach(self, observer: Observer):
+        if observer in self._observers:
+            super().detach(observer)
+            ch = self._channels.pop(id(observer))
+            ch.flush()
+            ch.close()
+
+    def notify(self, signal: dict):
+        channels = self._channels
+        for observer in self._matching(signal):
+            channels[id(observer)].put(signal)
+
+    def dropped(self) -> int:
+        """Total signals discarded by the backpressure policy."""
+        return sum(ch.dropped for ch in self._channels.values())
+
+    def flush(self):
+        for ch in list(self._channels.values()):
+            ch.flush()
+
+    def close(self):
+        self.flush()
+        for ch in list(self._channels.values()):
+            ch.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from collections import deque, defaultdict
+from functools import partial
 from math import sqrt
 from typing import Dict, Deque, List, Optional, Any
 import json
+import numpy as np
 from models import MarketDataPoint
 
 class Strategy(ABC):
@@ -11,6 +13,51 @@ class Strategy(ABC):
         """Makes sure that the generate_signals method is implemented in the subclasses."""
         pass
 
+    def symbol_state(self, symbols) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-symbol state for the given symbols, as {attribute: {symbol: value}}.
+
+        Strategies keep their rolling state in dict attributes keyed by
+        symbol; this picks out the entries of those symbols so a copy of the
+        strategy that ran on them (e.g. a shard worker) can hand them back.
+        """
+        symbols = set(symbols)
+        return {
+            name: {sym: val for sym, val in attr.items() if sym in symbols}
+            for name, attr in vars(self).items()
+            if isinstance(attr, dict)
+        }
+
+    def merge_symbol_state(self, state: Dict[str, Dict[str, Any]]):
+        """Overwrites this strategy's entries with those from symbol_state()."""
+        for name, entries in state.items():
+            getattr(self, name).update(entries)
+
+
+def _window_sums_before(x: np.ndarray, n: int) -> np.ndarray:
+    """
+    Rolling sum of the last n values of x *before* each element, computed with
+    the same subtract-then-add recurrence the tick path uses. Kept sequential on
+    purpose so the floating-point result is bit-for-bit identical.
+    """
+    xs = x.tolist()
+    out = [0.0] * len(xs)
+    s = 0.0
+    for j, v in enumerate(xs):
+        out[j] = s
+        if j >= n:
+            s -= xs[j - n]
+        s += v
+    return np.array(out, dtype=np.float64)
+
+
+def _batch_actions(buy: np.ndarray, sell: np.ndarray, positions: np.ndarray):
+    """Turns BUY/SELL masks into (indices, actions) arrays."""
+    hit = buy | sell
+    idx = positions[hit].astype(np.int64)
+    actions = np.where(buy[hit], "BUY", "SELL")
+    return idx, actions
+
 
 class BreakoutStrategy(Strategy):
     """This is a Volatility Breakout Strategy."""
@@ -20,7 +67,7 @@ class BreakoutStrategy(Strategy):
         self.k = 1.0 + float(threshold)
 
         self.prev_price: Dict[str, float] = {}
-        self.ret_win: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.n))
+        self.ret_win: Dict[str, Deque[float]] = defaultdict(partial(deque, maxlen=self.n))
         self.sum_ret: Dict[str, float] = defaultdict(float)
         self.sum_sq: Dict[str, float] = defaultdict(float)
 
@@ -67,6 +114,42 @@ class BreakoutStrategy(Strategy):
         self.prev_price[sym] = px
         return out
 
+    def generate_signals_batch(self, prices, timestamps=None):
+        """
+        Batch version of generate_signals for one symbol's full price history.
+
+        Starts from an empty state and returns (indices, actions): the tick
+        positions that signal and their "BUY"/"SELL" action, identical to
+        feeding the ticks one by one into a fresh strategy. Timestamps are
+        accepted for symmetry with the tick path; signals do not depend on them.
+        """
+        px = np.asarray(prices, dtype=np.float64)
+        if timestamps is not None and len(timestamps) != len(px):
+            raise ValueError("prices and timestamps must have the same length.")
+        empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype="<U4"))
+        if len(px) < 2:
+            return empty
+
+        # A return exists at tick i when the previous price was positive.
+        valid = px[:-1] > 0
+        pos = np.nonzero(valid)[0] + 1
+        r = px[pos] / px[pos - 1] - 1.0
+
+        n = self.n
+        j = np.arange(len(r))
+        full = j >= n
+        s = _window_sums_before(r, n)
+        ss = _window_sums_before(r * r, n)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            m = s / n
+            var = (ss - n * m * m) / (n - 1) if n > 1 else np.zeros_like(m)
+            std = np.where(var > 0, np.sqrt(np.where(var > 0, var, 0.0)), 0.0)
+        up = self.k * std
+        live = full & (std > 0)
+        buy = live & (r > up)
+        sell = live & ~buy & (r < -up)
+        return _batch_actions(buy, sell, pos)
+
 
 class MeanReversionStrategy(Strategy):
     """This is a Mean Reversion Strategy."""
@@ -75,7 +158,7 @@ class MeanReversionStrategy(Strategy):
         self.n = int(lookback_window)
         self.band = float(threshold)
 
-        self.prices: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=self.n))
+        self.prices: Dict[str, Deque[float]] = defaultdict(partial(deque, maxlen=self.n))
         self.sum_px: Dict[str, float] = defaultdict(float)
         self.sum_sq_px: Dict[str, float] = defaultdict(float)
 
@@ -117,6 +200,27 @@ class MeanReversionStrategy(Strategy):
 
         return out
 
+    def generate_signals_batch(self, prices, timestamps=None):
+        """
+        Batch version of generate_signals for one symbol's full price history.
+
+        Starts from an empty state and returns (indices, actions), identical
+        to feeding the ticks one by one into a fresh strategy.
+        """
+        px = np.asarray(prices, dtype=np.float64)
+        if timestamps is not None and len(timestamps) != len(px):
+            raise ValueError("prices and timestamps must have the same length.")
+
+        n = self.n
+        j = np.arange(len(px))
+        m = _window_sums_before(px, n) / n
+        upper = m * (1.0 + self.band)
+        lower = m * (1.0 - self.band)
+        full = j >= n
+        buy = full & (px < lower)
+        sell = full & ~buy & (px > upper)
+        return _batch_actions(buy, sell, j)
+
 
 def load_strategy_params(json_path: str) -> Dict[str, Dict[str, Any]]:
     with open(json_path, "r", encoding="utf-8") as f:
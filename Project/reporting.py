@@ -1,4 +1,9 @@
+import atexit
 import logging
+import queue
+import sys
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO, format="%(message)s")
 
@@ -26,3 +31,124 @@ class AlertObserver:
         if notional >= self.min_notional:
             print(f"[ALERT] Large trade detected: {signal['symbol']} {signal['action']} "
                   f"Qty={qty} Notional={notional:.2f}")
+
+
+class _BatchWriter:
+    """
+    Background thread that hands queued items to write_batch(batch) in batches.
+
+    A batch is written every flush_interval seconds, or sooner once batch_size
+    items are waiting. An exception from write_batch is logged and that batch
+    dropped; the thread keeps serving later items.
+    """
+
+    _STOP = object()
+
+    def __init__(self, write_batch, flush_interval=0.5, batch_size=10_000, name="batch-writer"):
+        self._write_batch = write_batch
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.errors = 0
+        self._q = queue.SimpleQueue()
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item):
+        self._q.put(item)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self._write_batch(batch)
+        except Exception:
+            self.errors += 1
+            logging.getLogger(__name__).exception("%s: dropped a batch of %d records", self._thread.name, len(batch))
+        batch.clear()
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._q.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+            if item is self._STOP:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):  # flush() request
+                self._write(batch)
+                item.set()
+            elif item is not None:
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+                self._write(batch)
+            else:
+                self._write(batch)
+            deadline = time.monotonic() + self.flush_interval
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Blocks until everything queued so far has been handed to write_batch.
+        Returns False on timeout or if the writer thread is no longer running.
+        """
+        if self.closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._q.put(done)
+        end = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                return False
+            if end is not None and time.monotonic() >= end:
+                return False
+        return True
+
+    def close(self, timeout=None):
+        if self.closed:
+            return
+        self.closed = True
+        self._q.put(self._STOP)
+        self._thread.join(timeout)
+
+
+class BatchedLoggerObserver:
+    """
+    Logs all signals like LoggerObserver, but off the hot path.
+
+    update() only puts a raw (timestamp, symbol, action, price) tuple on a
+    queue, QueueHandler-style. A _BatchWriter thread formats whole batches and
+    writes them in one call every flush_interval seconds, or sooner once
+    batch_size records are waiting. A failed write is logged and skipped.
+    close() (also run at interpreter exit) drains and writes everything still
+    queued.
+    """
+
+    def __init__(self, path=None, stream=None, flush_interval=0.5, batch_size=10_000):
+        self._own_stream = path is not None
+        self._stream = open(path, "a", encoding="utf-8") if path is not None else (stream or sys.stderr)
+        self._writer = _BatchWriter(self._write, flush_interval, batch_size, name="batched-logger")
+        atexit.register(self.close)
+
+    def update(self, signal: dict):
+        self._writer.put((signal['timestamp'], signal['symbol'], signal['action'], signal['price']))
+
+    def _write(self, batch):
+        self._stream.write("".join(f"[LOG] {ts} | {sym} | {action} @ {price}\n"
+                                   for ts, sym, action, price in batch))
+        self._stream.flush()
+
+    def flush(self, timeout=None) -> bool:
+        """Blocks until everything queued so far has been written (False on timeout or dead writer)."""
+        return self._writer.flush(timeout)
+
+    def close(self):
+        if self._writer.closed:
+            return
+        self._writer.close()
+        if self._own_stream:
+            self._stream.close()
+        atexit.unregister(self.close)
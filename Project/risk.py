@@ -0,0 +1,229 @@
+# risk.py
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+
+class CompiledPortfolio:
+    """
+    Flat NumPy view of a Portfolio composite.
+
+    The tree is walked once in pre-order, so every node's positions (its own and
+    all of its sub-portfolios') sit in one contiguous range [start, end) of the
+    flat position arrays. From that node -> position index we build a
+    nodes x symbols quantity matrix, so revaluing every sub-portfolio under
+    every scenario is a single matrix product.
+    """
+
+    def __init__(self, node_names, node_depth, node_start, node_end, pos_symbol, pos_qty, pos_price, symbols):
+        self.node_names = node_names          # "Main/Index Holdings", root first
+        self.node_depth = np.asarray(node_depth, dtype=np.int64)
+        self.node_start = np.asarray(node_start, dtype=np.int64)
+        self.node_end = np.asarray(node_end, dtype=np.int64)
+        self.pos_symbol = np.asarray(pos_symbol, dtype=np.int64)   # column in symbols
+        self.pos_qty = np.asarray(pos_qty, dtype=np.float64)
+        self.pos_price = np.asarray(pos_price, dtype=np.float64)
+        self.symbols = list(symbols)
+        self.symbol_to_col = {s: i for i, s in enumerate(self.symbols)}
+
+        self.quantities = np.zeros((len(node_names), len(self.symbols)))
+        for k in range(len(node_names)):
+            sl = slice(self.node_start[k], self.node_end[k])
+            np.add.at(self.quantities[k], self.pos_symbol[sl], self.pos_qty[sl])
+
+    @staticmethod
+    def from_portfolio(portfolio) -> "CompiledPortfolio":
+        names, depth, start, end = [], [], [], []
+        pos_symbol, pos_qty, pos_price = [], [], []
+        symbol_to_col = {}
+
+        def walk(node, path, d):
+            k = len(names)
+            names.append(path)
+            depth.append(d)
+            start.append(len(pos_qty))
+            end.append(None)
+            for p in node.positions:
+                pos_symbol.append(symbol_to_col.setdefault(p.symbol, len(symbol_to_col)))
+                pos_qty.append(float(p.quantity))
+                pos_price.append(float(p.price))
+            for sub_name, sub in node.sub_portfolios.items():
+                walk(sub, f"{path}/{sub_name}", d + 1)
+            end[k] = len(pos_qty)
+
+        walk(portfolio, portfolio.name, 0)
+        return CompiledPortfolio(names, depth, start, end, pos_symbol, pos_qty, pos_price, list(symbol_to_col))
+
+    def base_prices(self) -> np.ndarray:
+        """Price vector (one per symbol) taken from the positions themselves."""
+        px = np.zeros(len(self.symbols))
+        px[self.pos_symbol] = self.pos_price
+        return px
+
+    def _align(self, prices, symbols):
+        P = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        if symbols is None:
+            if P.shape[1] != len(self.symbols):
+                raise ValueError(f"Expected {len(self.symbols)} price columns, got {P.shape[1]}.")
+            return P
+        col = {s: i for i, s in enumerate(symbols)}
+        missing = [s for s in self.symbols if s not in col]
+        if missing:
+            raise ValueError(f"Scenario prices missing symbols: {missing}")
+        return P[:, [col[s] for s in self.symbols]]
+
+    def revalue(self, prices, symbols=None) -> np.ndarray:
+        """
+        Values every node under every scenario.
+
+        prices is a scenarios x symbols matrix; its columns follow self.symbols
+        unless a symbols list is given. Returns a scenarios x nodes matrix whose
+        columns follow self.node_names.
+        """
+        return self._align(prices, symbols) @ self.quantities.T
+
+
+class PortfolioRiskEngine:
+    """
+    Covariance, VaR and per-node VaR contributions for a CompiledPortfolio.
+
+    Return rows (one column per symbol, in compiled.symbols order) are added
+    with add_returns(). The covariance is kept as running mean/co-moment
+    accumulators merged block by block, so an intraday refresh only costs the
+    new rows, not the whole history. Rows live in one preallocated buffer that
+    grows by doubling; node P&L for historical VaR is cached alongside and only
+    recomputed, in one product, the first time it is needed after set_prices.
+
+    history=None keeps every row. history=n keeps a rolling window of the last
+    n rows: older rows are dropped from the buffer and subtracted back out of
+    the covariance accumulators, which are resynced exactly from the buffer
+    whenever it is compacted.
+    """
+
+    def __init__(self, compiled: CompiledPortfolio, prices=None, history: int = None, capacity: int = 256):
+        if history is not None and history < 2:
+            raise ValueError("history must keep at least two return rows.")
+        self.compiled = compiled
+        self.history = history
+        k = len(compiled.symbols)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+        # Live rows are _returns[_start:_end]; _pnl holds their node P&L when not _pnl_stale.
+        self._returns = np.empty((max(capacity, 1), k))
+        self._pnl = np.empty((max(capacity, 1), len(compiled.node_names)))
+        self._start = self._end = 0
+        self._pnl_stale = False
+        self.set_prices(compiled.base_prices() if prices is None else prices)
+
+    def set_prices(self, prices, symbols=None):
+        """Sets current prices; node dollar exposures per symbol become quantities * prices."""
+        px = self.compiled._align(prices, symbols)[0]
+        self.exposures = self.compiled.quantities * px   # nodes x symbols
+        self._pnl_stale = True
+
+    def _merge(self, R, sign):
+        """Adds (sign=1) or removes (sign=-1) the rows R from the running accumulators."""
+        nb = len(R)
+        mean_b = R.mean(axis=0)
+        D = R - mean_b
+        c_b = D.T @ D
+        n = self.n
+        total = n + sign * nb
+        if total == 0:
+            self.mean = np.zeros_like(self.mean)
+            self.comoment = np.zeros_like(self.comoment)
+        elif sign > 0:
+            delta = mean_b - self.mean
+            self.mean = self.mean + delta * (nb / total)
+            self.comoment = self.comoment + c_b + np.outer(delta, delta) * (n * nb / total)
+        else:
+            rest = (self.mean * n - mean_b * nb) / total
+            delta = mean_b - rest
+            self.mean = rest
+            self.comoment = self.comoment - c_b - np.outer(delta, delta) * (total * nb / n)
+        self.n = total
+
+    def _reserve(self, nb):
+        """Makes room for nb more rows, moving live rows to the front or growing the buffer."""
+        if self._end + nb <= len(self._returns):
+            return
+        live = self._end - self._start
+        # A rolling window keeps the buffer at most half full after compacting,
+        # so compactions (and their resyncs) come only every ~history rows.
+        need = 2 * (live + nb) if self.history is not None else live + nb
+        cap = len(self._returns)
+        while need > cap:
+            cap *= 2
+        for name in ("_returns", "_pnl"):
+            old = getattr(self, name)
+            buf = old if cap == len(old) else np.empty((cap, old.shape[1]))
+            buf[:live] = old[self._start:self._end]
+            setattr(self, name, buf)
+        self._start, self._end = 0, live
+        if self.history is not None and live:
+            # Resync from the rows themselves so repeated removals can't drift.
+            self.n = 0
+            self.mean = np.zeros_like(self.mean)
+            self.comoment = np.zeros_like(self.comoment)
+            self._merge(self._returns[:live], 1)
+
+    def add_returns(self, returns, symbols=None):
+        """Merges new return rows into the covariance (Chan et al. parallel update)."""
+        R = self.compiled._align(returns, symbols)
+        if self.history is not None:
+            R = R[-self.history:]  # rows that would be dropped straight away
+        nb = len(R)
+        if nb == 0:
+            return
+        self._reserve(nb)
+        self._merge(R, 1)
+        end = self._end + nb
+        self._returns[self._end:end] = R
+        if not self._pnl_stale:
+            self._pnl[self._end:end] = R @ self.exposures.T
+        self._end = end
+
+        if self.history is not None and self.n > self.history:
+            drop = self.n - self.history
+            self._merge(self._returns[self._start:self._start + drop], -1)
+            self._start += drop
+
+    def covariance(self) -> np.ndarray:
+        if self.n < 2:
+            raise ValueError("Need at least two return rows for a covariance.")
+        return self.comoment / (self.n - 1)
+
+    def _node_variance(self):
+        cov = self.covariance()
+        return np.einsum("ij,jk,ik->i", self.exposures, cov, self.exposures)
+
+    def parametric_var(self, confidence=0.99) -> np.ndarray:
+        """Gaussian VaR (a positive loss) of every node, zero-mean returns."""
+        z = NormalDist().inv_cdf(confidence)
+        return z * np.sqrt(np.maximum(self._node_variance(), 0.0))
+
+    def historical_var(self, confidence=0.99) -> np.ndarray:
+        """Historical-simulation VaR (a positive loss) of every node over the retained return rows."""
+        if self._end == self._start:
+            raise ValueError("No return history.")
+        live = slice(self._start, self._end)
+        if self._pnl_stale:
+            self._pnl[live] = self._returns[live] @ self.exposures.T
+            self._pnl_stale = False
+        return -np.quantile(self._pnl[live], 1.0 - confidence, axis=0)
+
+    def var_contributions(self, confidence=0.99) -> np.ndarray:
+        """
+        Each node's component contribution to the root's parametric VaR:
+        z * e_node' S e_root / sigma_root. The contributions of a node's own
+        positions and its direct sub-portfolios add up to the node's value.
+        """
+        cov = self.covariance()
+        root = self.exposures[0]
+        sigma = math.sqrt(max(float(root @ cov @ root), 0.0))
+        if sigma == 0:
+            return np.zeros(len(self.exposures))
+        z = NormalDist().inv_cdf(confidence)
+        return z * (self.exposures @ (cov @ root)) / sigma
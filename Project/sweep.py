@@ -0,0 +1,254 @@
+# sweep.py
+"""
+Parallel parameter sweep over BreakoutStrategy / MeanReversionStrategy.
+
+    python sweep.py data/market_data.csv sweep_grid.json --out sweep_results.csv
+
+The grid file maps strategy names to lists of values, e.g.
+{"BreakoutStrategy": {"lookback_window": [10, 15, 20], "threshold": [0.02, 0.03]}}.
+Parameters left out of the grid are taken from data/strategy_params.json.
+"""
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from engine import Engine
+from models import Broker, MarketDataPoint
+from patterns.Strategy import BreakoutStrategy, MeanReversionStrategy, load_strategy_params
+from tick_store import _to_epoch_ns
+
+STRATEGIES = {
+    "BreakoutStrategy": BreakoutStrategy,
+    "MeanReversionStrategy": MeanReversionStrategy,
+}
+
+DEFAULT_PARAMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "strategy_params.json")
+
+
+def expand_grid(grids, base_params=None):
+    """Turns {strategy: {param: [values]}} into a list of (strategy, params) runs."""
+    base_params = base_params or {}
+    runs = []
+    for name, grid in grids.items():
+        if name not in STRATEGIES:
+            raise ValueError(f"Unknown strategy in grid: {name}")
+        keys = list(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(base_params.get(name, {}))
+            params.update(zip(keys, values))
+            runs.append((name, params))
+    return runs
+
+
+def _run_key(name, params):
+    return json.dumps([name, params], sort_keys=True)
+
+
+# ---------- shared tick data ----------
+
+def _ticks_to_columns(ticks):
+    symbol_to_id = {}
+    ts, sid, px = [], [], []
+    for t in ticks:
+        ts.append(_to_epoch_ns(t.timestamp) if isinstance(t.timestamp, datetime) else int(t.timestamp))
+        sid.append(symbol_to_id.setdefault(t.symbol, len(symbol_to_id)))
+        px.append(float(t.price))
+    cols = {
+        "timestamps": np.asarray(ts, dtype=np.int64),
+        "symbol_ids": np.asarray(sid, dtype=np.int32),
+        "prices": np.asarray(px, dtype=np.float64),
+    }
+    return cols, list(symbol_to_id)
+
+
+def _share(cols):
+    """Copies each column into a SharedMemory block; returns blocks and a picklable spec."""
+    blocks, spec = [], {}
+    for name, arr in cols.items():
+        shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[:] = arr
+        blocks.append(shm)
+        spec[name] = (shm.name, arr.shape, arr.dtype.str)
+    return blocks, spec
+
+
+_WORKER = {}
+
+
+def _init_worker(spec, symbols):
+    # Attach read-only views; keep the SharedMemory handles alive for the process lifetime.
+    _WORKER["blocks"] = []
+    for name, (shm_name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        _WORKER[name] = arr
+        _WORKER["blocks"].append(shm)
+    _WORKER["symbols"] = symbols
+
+
+def _backtest(name, params, starting_cash, block_rows=65_536):
+    """
+    One backtest over the shared ticks. Tick timestamps are passed as epoch-ns ints.
+
+    The shared columns are converted to Python objects block_rows at a time,
+    so a worker never holds a private copy of the whole tick set.
+    """
+    strategy = STRATEGIES[name](**params)
+    broker = Broker(starting_cash=starting_cash)
+    engine = Engine(strategy, broker)
+    symbols = _WORKER["symbols"]
+    timestamps, symbol_ids, prices = _WORKER["timestamps"], _WORKER["symbol_ids"], _WORKER["prices"]
+    for start in range(0, len(prices), block_rows):
+        stop = start + block_rows
+        ts = timestamps[start:stop].tolist()
+        sid = symbol_ids[start:stop].tolist()
+        px = prices[start:stop].tolist()
+        for t, s, p in zip(ts, sid, px):
+            engine.on_tick(MarketDataPoint(t, symbols[s], p))
+    equity = broker.equity()
+    return {
+        "strategy": name,
+        "params": params,
+        "equity": equity,
+        "pnl": equity - starting_cash,
+        "n_trades": len(broker.trades),
+    }
+
+
+# ---------- driver ----------
+
+def _fingerprint(cols, symbols, starting_cash, base_params):
+    """Hash of everything a finished row depends on besides its own (strategy, params)."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([len(cols["prices"]), symbols, starting_cash, base_params], sort_keys=True).encode())
+    for name in sorted(cols):
+        h.update(np.ascontiguousarray(cols[name]).tobytes())
+    return h.hexdigest()
+
+
+def _load_progress(progress_path, fingerprint):
+    """Finished rows from progress_path, or None if it is missing or was written for other inputs."""
+    if not (progress_path and os.path.exists(progress_path)):
+        return None
+    done = {}
+    with open(progress_path, "r", encoding="utf-8") as f:
+        try:
+            header = json.loads(f.readline())
+        except json.JSONDecodeError:
+            header = None
+        if not isinstance(header, dict) or header.get("fingerprint") != fingerprint:
+            return None  # other market data, cash or defaults: start over
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # half-written last line from an interrupted run
+            done[_run_key(row["strategy"], row["params"])] = row
+    return done
+
+
+def _open_progress(progress_path, fingerprint, fresh):
+    """
+    Opens the progress file for appending, terminating any half-written last
+    line; a fresh file starts with the inputs' fingerprint.
+    """
+    if fresh:
+        f = open(progress_path, "w", encoding="utf-8")
+        f.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        f.flush()
+        return f
+    f = open(progress_path, "a+", encoding="utf-8")
+    if f.tell() > 0:
+        f.seek(f.tell() - 1)
+        if f.read(1) != "\n":
+            f.write("\n")
+    return f
+
+
+def write_results(rows, out_csv):
+    """Writes the ranked results table (best pnl first)."""
+    ranked = sorted(rows, key=lambda r: r["pnl"], reverse=True)
+    with open(out_csv, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["rank", "strategy", "params", "pnl", "equity", "n_trades"])
+        for i, r in enumerate(ranked, 1):
+            w.writerow([i, r["strategy"], json.dumps(r["params"], sort_keys=True),
+                        round(r["pnl"], 2), round(r["equity"], 2), r["n_trades"]])
+    return ranked
+
+
+def run_sweep(ticks, grids, out_csv, progress_path=None, starting_cash=100_000.0,
+              n_workers=None, params_path=DEFAULT_PARAMS_PATH):
+    """
+    Runs one backtest per parameter set and writes a ranked results table.
+
+    Finished runs are appended to progress_path (default: out_csv + ".progress")
+    as they complete, so an interrupted sweep picks up where it stopped. The
+    file is tagged with a fingerprint of the ticks, starting_cash and default
+    params; rows written for other inputs are discarded, not reused.
+    """
+    base = load_strategy_params(params_path) if params_path and os.path.exists(params_path) else {}
+    runs = expand_grid(grids, base)
+    progress_path = progress_path or out_csv + ".progress"
+    cols, symbols = _ticks_to_columns(ticks)
+    fingerprint = _fingerprint(cols, symbols, starting_cash, base)
+    done = _load_progress(progress_path, fingerprint)
+    fresh = done is None
+    done = done or {}
+    todo = [(n, p) for n, p in runs if _run_key(n, p) not in done]
+
+    if todo:
+        blocks, spec = _share(cols)
+        del cols
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker,
+                                     initargs=(spec, symbols)) as pool, \
+                    _open_progress(progress_path, fingerprint, fresh) as progress:
+                futures = [pool.submit(_backtest, n, p, starting_cash) for n, p in todo]
+                for fut in as_completed(futures):
+                    row = fut.result()
+                    done[_run_key(row["strategy"], row["params"])] = row
+                    progress.write(json.dumps(row) + "\n")
+                    progress.flush()
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    rows = [done[_run_key(n, p)] for n, p in runs]
+    return write_results(rows, out_csv)
+
+
+def main():
+    from data_loader import iter_csv_ticks
+
+    ap = argparse.ArgumentParser(description="Parallel strategy parameter sweep.")
+    ap.add_argument("market_data")
+    ap.add_argument("grid")
+    ap.add_argument("--out", default="sweep_results.csv")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--cash", type=float, default=100_000.0)
+    args = ap.parse_args()
+
+    with open(args.grid, "r", encoding="utf-8") as f:
+        grids = json.load(f)
+    ranked = run_sweep(iter_csv_ticks(args.market_data), grids, args.out,
+                       starting_cash=args.cash, n_workers=args.workers)
+    for r in ranked[:10]:
+        print(f"{r['strategy']:<22} {json.dumps(r['params'], sort_keys=True):<45} pnl={r['pnl']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
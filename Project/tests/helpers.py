@@ -0,0 +1,15 @@
+"""Shared test helpers (not a test module)."""
+import random
+
+from models import MarketDataPoint
+
+
+def make_ticks(n=3000, symbols=("AAPL", "MSFT", "SPY", "QQQ", "IWM", "ZTS")):
+    rnd = random.Random(3)
+    px = {s: 100.0 for s in symbols}
+    out = []
+    for i in range(n):
+        s = symbols[i % len(symbols)]
+        px[s] *= 1.0 + rnd.gauss(0, 0.01)
+        out.append(MarketDataPoint(i, s, px[s]))
+    return out
@@ -0,0 +1,114 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from analytics import (AnalyticsContext, BetaDecorator, DrawdownDecorator, VolatilityDecorator,
+                       _beta, _max_drawdown, _stdev_annualized, _to_returns)
+from models import Stock
+
+
+asset_prices = pd.Series([214, 218, 210, 230, 231, 233, 230, 245])
+market_prices = pd.Series([100, 100, 101, 101, 102, 103, 104, 104])
+
+
+def test_chained_decorators_share_one_context():
+    ctx = AnalyticsContext()
+    wm = Stock(symbol="WM", price=245, issuer="Waste Management Inc.", sector="Industrial")
+    decorated = DrawdownDecorator(
+        BetaDecorator(VolatilityDecorator(wm, asset_prices, periods_per_year=12, context=ctx),
+                      asset_prices, market_prices, context=ctx),
+        asset_prices, context=ctx)
+
+    m = decorated.get_metrics()
+    a_ret, m_ret = _to_returns(asset_prices), _to_returns(market_prices)
+    assert m["volatility_ann"] == _stdev_annualized(a_ret, periods_per_year=12)
+    assert m["beta"] == _beta(a_ret, m_ret)
+    assert m["max_drawdown"] == _max_drawdown(asset_prices)
+    assert m["symbol"] == "WM"
+
+    # asset returns are computed once and reused by the beta alignment
+    assert ctx.misses == 6  # vol, returns(asset), beta, aligned, returns(market), mdd
+    decorated.get_metrics()
+    assert ctx.misses == 6
+
+
+def test_decorators_without_context_see_in_place_updates():
+    wm = Stock(symbol="WM", price=245, issuer="Waste Management Inc.", sector="Industrial")
+    px = [100.0, 110.0, 99.0]
+    decorated = DrawdownDecorator(VolatilityDecorator(wm, px), px)
+    before = decorated.get_metrics()
+    px.append(150.0)
+    after = decorated.get_metrics()
+    assert after["volatility_ann"] == _stdev_annualized(_to_returns(px))
+    assert after["volatility_ann"] != before["volatility_ann"]
+
+
+def test_context_evicts_least_recently_used():
+    ctx = AnalyticsContext(maxsize=2)
+    a, b, c = pd.Series([1.0, 2.0]), pd.Series([1.0, 3.0]), pd.Series([2.0, 1.0])
+    ctx.returns(a)
+    ctx.returns(b)
+    ctx.returns(a)  # a is now most recent
+    ctx.returns(c)  # evicts b
+    misses = ctx.misses
+    ctx.returns(a)
+    assert ctx.misses == misses
+    ctx.returns(b)
+    assert ctx.misses == misses + 1
+
+
+def test_bulk_risk_metrics_matches_per_instrument_helpers():
+    import numpy as np
+    from analytics import RiskSheetDecorator, bulk_risk_metrics
+
+    rng = np.random.default_rng(3)
+    frame = pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (250, 6)), axis=0)),
+                         columns=[f"S{i}" for i in range(6)])
+    market = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.01, 250))))
+
+    sheet = bulk_risk_metrics(frame, market, periods_per_year=252)
+    for col in frame.columns:
+        ret = _to_returns(frame[col])
+        assert np.isclose(sheet.loc[col, "volatility_ann"], _stdev_annualized(ret))
+        assert np.isclose(sheet.loc[col, "beta"], _beta(ret, _to_returns(market)))
+        assert np.isclose(sheet.loc[col, "max_drawdown"], _max_drawdown(frame[col]))
+
+    s2 = Stock(symbol="S2", price=1.0, issuer="x", sector="y")
+    m = RiskSheetDecorator(s2, sheet).get_metrics()
+    assert m["symbol"] == "S2" and m["beta"] == float(sheet.loc["S2", "beta"])
+
+
+def test_streaming_analytics_matches_full_history_definitions():
+    import numpy as np
+    from analytics import StreamingAnalytics
+    from engine import Engine
+    from models import Broker, MarketDataPoint
+    from patterns.Strategy import MeanReversionStrategy
+
+    rng = np.random.default_rng(5)
+    n = 300
+    mkt = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    aapl = 50 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+    live = StreamingAnalytics(market_symbol="SPY", periods_per_year=252)
+    rolling = StreamingAnalytics(market_symbol="SPY", periods_per_year=252, window=40)
+    engine = Engine(MeanReversionStrategy(), Broker(10_000), analytics=live)
+    for t in range(n):
+        for sym, px in (("SPY", mkt[t]), ("AAPL", aapl[t])):
+            tick = MarketDataPoint(t, sym, float(px))
+            engine.on_tick(tick)
+            rolling.update(tick)
+
+    a_ret, m_ret = _to_returns(pd.Series(aapl)), _to_returns(pd.Series(mkt))
+    m = live.metrics("AAPL")
+    assert np.isclose(m["volatility_ann"], _stdev_annualized(a_ret))
+    assert np.isclose(m["beta"], _beta(a_ret, m_ret))
+    assert np.isclose(m["max_drawdown"], _max_drawdown(pd.Series(aapl)))
+    assert np.isclose(live.metrics("SPY")["beta"], 1.0)
+
+    r = rolling.metrics("AAPL")
+    assert np.isclose(r["volatility_ann"], _stdev_annualized(a_ret.iloc[-40:]))
+    assert np.isclose(r["beta"], _beta(a_ret.iloc[-40:], m_ret.iloc[-40:]))
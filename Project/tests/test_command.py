@@ -41,4 +41,111 @@ def test_command_execute_undo_redo():
     after_redo = broker.summary()
     assert after_redo["cash"] == 9000.0
     positions_after_redo = {p["symbol"]: p for p in after_redo["positions"]}
-    assert positions_after_redo["ADBE"]["qty"] == 10
\ No newline at end of file
+    assert positions_after_redo["ADBE"]["qty"] == 10
+
+def test_closing_position_keeps_other_positions():
+    broker = Broker(starting_cash=10_000.0)
+    broker.execute_order("ADBE", "BUY", 1, 100.0)
+    broker.execute_order("MSFT", "BUY", 1, 100.0)
+    broker.execute_order("MSFT", "SELL", 1, 100.0)
+    assert [p["symbol"] for p in broker.summary()["positions"]] == ["ADBE"]
+
+
+def test_position_index_stays_in_sync():
+    broker = Broker(starting_cash=10_000.0)
+    for sym in ("A", "B", "C", "D"):
+        broker.execute_order(sym, "BUY", 2, 10.0)
+    broker.execute_order("B", "SELL", 2, 10.0)  # close from the middle
+    broker.execute_order("D", "SELL", 1, 10.0)
+
+    positions = broker.root_portfolio.positions
+    assert [p.symbol for p in positions] == ["A", "C", "D"]  # opening order survives the close
+    for sym in ("A", "C", "D"):
+        assert broker.get_position(sym).symbol == sym
+    assert broker.get_position("B") is None
+    assert broker.get_position("D").quantity == 1
+
+    # Reopening goes to the end; editing the list directly needs a reindex
+    broker.execute_order("B", "BUY", 1, 10.0)
+    assert [p["symbol"] for p in broker.summary()["positions"]] == ["A", "C", "D", "B"]
+    positions.reverse()
+    broker._reindex_positions()
+    assert [p["symbol"] for p in broker.summary()["positions"]] == ["B", "D", "C", "A"]
+    broker.execute_order("C", "SELL", 2, 10.0)
+    assert [p.symbol for p in positions] == ["B", "D", "A"]
+    assert abs(broker.equity() - (broker.cash + broker._full_market_value())) < 1e-9
+
+
+def test_running_equity_matches_full_recompute():
+    import random
+    from models import MarketDataPoint
+
+    rnd = random.Random(1)
+    broker = Broker(starting_cash=10_000.0, reconcile_every=0)
+    for i in range(5000):
+        sym = rnd.choice("ABCDEFG")
+        if rnd.random() < 0.5:
+            broker.update_price(MarketDataPoint(i, sym, rnd.uniform(50, 150)))
+        else:
+            broker.execute_order(sym, rnd.choice(["BUY", "SELL"]), rnd.randint(1, 3), rnd.uniform(50, 150))
+
+    full = broker.cash + broker._full_market_value()
+    assert abs(broker.equity() - full) < 1e-6
+    assert abs(broker.reconcile()) < 1e-6
+    assert broker.equity() == full
+
+
+def test_bounded_invoker_folds_old_commands_into_checkpoint():
+    broker = Broker(starting_cash=10_000.0)
+    invoker = CommandInvoker(max_undo=3)
+    for i in range(10):
+        side = "BUY" if i % 3 else "SELL"
+        invoker.do(ExecuteOrderCommand(broker, {"timestamp": f"t{i}", "symbol": "ADBE", "side": side,
+                                                "qty": 2, "price": 10.0 + i}))
+    assert len(invoker.done) == 3
+    assert invoker.checkpoint.n_commands == 7
+
+    # Checkpoint + retained commands reproduce the broker's cash
+    retained = sum((-1 if c.order["side"] == "BUY" else 1) * c.order["qty"] * c.order["price"] for c in invoker.done)
+    assert abs(10_000.0 + invoker.checkpoint.cash_delta + retained - broker.cash) < 1e-9
+
+    # Recent undo/redo still work, but only back to the configured depth
+    cash = broker.cash
+    for _ in range(5):
+        invoker.undo()
+    assert len(invoker.undone) == 3
+    for _ in range(3):
+        invoker.redo()
+    assert broker.cash == cash
+    assert invoker.checkpoint.n_commands == 7
+
+
+def test_batch_order_command_nets_per_symbol():
+    from patterns.Command import BatchOrderCommand
+
+    orders = [
+        {"timestamp": "t1", "symbol": "ADBE", "side": "BUY", "qty": 5, "price": 100.0},
+        {"timestamp": "t1", "symbol": "MSFT", "side": "BUY", "qty": 2, "price": 50.0},
+        {"timestamp": "t1", "symbol": "ADBE", "side": "SELL", "qty": 2, "price": 101.0},
+        {"timestamp": "t1", "symbol": "ADBE", "side": "BUY", "qty": 1, "price": 102.0},
+    ]
+    sequential = Broker(starting_cash=10_000.0)
+    for o in orders:
+        sequential.execute_order(o["symbol"], o["side"], o["qty"], o["price"])
+
+    broker = Broker(starting_cash=10_000.0)
+    calls = []
+    adjust = broker._adjust_position
+    broker._adjust_position = lambda *a: (calls.append(a[0]), adjust(*a))
+    invoker = CommandInvoker()
+    invoker.do(BatchOrderCommand(broker, orders))
+
+    assert sorted(calls) == ["ADBE", "MSFT"]  # one position update per symbol
+    assert broker.summary() == sequential.summary()
+    assert len(invoker.done) == 1
+
+    invoker.undo()
+    assert broker.summary()["cash"] == 10_000.0
+    assert broker.summary()["positions"] == []
+    invoker.redo()
+    assert broker.summary()["positions"] == sequential.summary()["positions"]
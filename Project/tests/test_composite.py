@@ -0,0 +1,136 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from models import Broker, Portfolio, Position
+from patterns.Builder import PortfolioBuilder
+
+
+def _tree():
+    data = {
+        "name": "Main",
+        "positions": [{"symbol": "AAPL", "quantity": 10, "price": 100.0}],
+        "sub_portfolios": [
+            {"name": "Index", "positions": [{"symbol": "SPY", "quantity": 2, "price": 400.0}],
+             "sub_portfolios": [{"name": "Small", "positions": [{"symbol": "IWM", "quantity": 5, "price": 200.0}]}]},
+            {"name": "Bonds", "positions": [{"symbol": "TLT", "quantity": 1, "price": 90.0}]},
+        ],
+    }
+    return PortfolioBuilder.from_dict(data).build()
+
+
+def test_cached_value_invalidates_path_to_root():
+    root = _tree()
+    index = root.sub_portfolios["Index"]
+    small = index.sub_portfolios["Small"]
+    bonds = root.sub_portfolios["Bonds"]
+
+    assert root.get_value() == 1000 + 800 + 1000 + 90
+    assert len(root.get_positions()) == 4
+    assert root.get_positions() is root.get_positions()  # served from cache
+
+    small.positions[0].price = 210.0
+    # Only the path Small -> Index -> Main is dirty; the sibling keeps its cache
+    assert small._value is None and index._value is None and root._value is None
+    assert bonds._value == 90
+    assert root.get_value() == 1000 + 800 + 1050 + 90
+
+    small.add_position(Position("IWN", 1, 10.0))
+    assert len(root.get_positions()) == 5
+    assert root.get_value() == 1000 + 800 + 1060 + 90
+
+    root.add_subportfolio(Portfolio(name="Cash", positions=[Position("USD", 5, 1.0)]))
+    assert root.get_value() == 1000 + 800 + 1060 + 90 + 5
+
+
+def test_broker_root_portfolio_cache_tracks_fills():
+    broker = Broker(starting_cash=1000.0)
+    broker.execute_order("A", "BUY", 2, 10.0)
+    broker.execute_order("B", "BUY", 1, 5.0)
+    assert broker.root_portfolio.get_value() == 25.0
+    broker.execute_order("A", "SELL", 2, 12.0)
+    assert broker.root_portfolio.get_value() == 5.0
+    assert [p.symbol for p in broker.root_portfolio.get_positions()] == ["B"]
+
+
+def test_compiled_portfolio_revalues_every_node():
+    import numpy as np
+    from risk import CompiledPortfolio
+
+    root = _tree()
+    cp = CompiledPortfolio.from_portfolio(root)
+    assert cp.node_names == ["Main", "Main/Index", "Main/Index/Small", "Main/Bonds"]
+
+    # Scenario 0 = today's prices reproduces get_value() on every node
+    rng = np.random.default_rng(0)
+    scen = np.vstack([cp.base_prices(), cp.base_prices() * rng.uniform(0.8, 1.2, (99, len(cp.symbols)))])
+    values = cp.revalue(scen)
+    assert values.shape == (100, 4)
+    nodes = [root, root.sub_portfolios["Index"], root.sub_portfolios["Index"].sub_portfolios["Small"],
+             root.sub_portfolios["Bonds"]]
+    assert np.allclose(values[0], [n.get_value() for n in nodes])
+
+    # Columns can come in any order when the symbol list is given
+    rev = scen[:, ::-1]
+    assert np.allclose(cp.revalue(rev, symbols=cp.symbols[::-1]), values)
+
+
+def test_portfolio_risk_engine_incremental_covariance_and_var():
+    import numpy as np
+    from statistics import NormalDist
+    from risk import CompiledPortfolio, PortfolioRiskEngine
+
+    cp = CompiledPortfolio.from_portfolio(_tree())
+    eng = PortfolioRiskEngine(cp)
+    rng = np.random.default_rng(11)
+    rows = rng.normal(0, 0.01, (500, len(cp.symbols)))
+    eng.add_returns(rows[:300])
+    eng.add_returns(rows[300:450])
+    for row in rows[450:]:
+        eng.add_returns(row)  # intraday: one row at a time
+
+    cov = np.cov(rows, rowvar=False)
+    assert np.allclose(eng.covariance(), cov)
+
+    e = cp.quantities * cp.base_prices()
+    z = NormalDist().inv_cdf(0.99)
+    assert np.allclose(eng.parametric_var(0.99), z * np.sqrt(np.einsum("ij,jk,ik->i", e, cov, e)))
+    assert np.allclose(eng.historical_var(0.95), -np.quantile(rows @ e.T, 0.05, axis=0))
+
+    contrib = eng.var_contributions(0.99)
+    assert np.isclose(contrib[0], eng.parametric_var(0.99)[0])
+    # Main = own AAPL position + Index + Bonds sub-portfolios
+    aapl = np.zeros(len(cp.symbols))
+    aapl[cp.symbol_to_col["AAPL"]] = e[0, cp.symbol_to_col["AAPL"]]
+    own = z * aapl @ cov @ e[0] / np.sqrt(e[0] @ cov @ e[0])
+    assert np.isclose(own + contrib[1] + contrib[3], contrib[0])
+
+
+def test_portfolio_risk_engine_rolling_history():
+    import numpy as np
+    from risk import CompiledPortfolio, PortfolioRiskEngine
+
+    cp = CompiledPortfolio.from_portfolio(_tree())
+    eng = PortfolioRiskEngine(cp, history=120, capacity=8)
+    rng = np.random.default_rng(5)
+    rows = rng.normal(0, 0.01, (700, len(cp.symbols)))
+    eng.add_returns(rows[:90])
+    for row in rows[90:650]:
+        eng.add_returns(row)
+    eng.add_returns(rows[650:])
+
+    window = rows[-120:]
+    assert eng.n == 120
+    assert np.allclose(eng.covariance(), np.cov(window, rowvar=False))
+    assert len(eng._returns) <= 4 * (120 + 50)  # bounded by the window, not the whole history
+
+    # New prices: P&L is recomputed lazily from the retained rows
+    px = cp.base_prices() * 1.1
+    eng.set_prices(px)
+    e = cp.quantities * px
+    assert np.allclose(eng.historical_var(0.95), -np.quantile(window @ e.T, 0.05, axis=0))
+    eng.add_returns(rows[:1])
+    window = np.vstack([rows[-119:], rows[:1]])
+    assert np.allclose(eng.historical_var(0.95), -np.quantile(window @ e.T, 0.05, axis=0))
+    assert np.allclose(eng.covariance(), np.cov(window, rowvar=False))
@@ -0,0 +1,128 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_loader import read_csv_to_immutable_list, iter_csv_ticks, iter_bloomberg_xml, BloombergXMLAdapter, YahooFinanceAdapter
+
+
+def _write_csv(path):
+    path.write_text(
+        "timestamp,symbol,price\n"
+        "2025-10-01T09:30:00,AAPL,172.35\n"
+        "2025-10-01T09:30:01,MSFT,328.10\n"
+        "2025-10-01T09:30:02,AAPL,172.40\n"
+    )
+
+
+def test_iter_csv_ticks_matches_list(tmp_path):
+    path = tmp_path / "market_data.csv"
+    _write_csv(path)
+
+    streamed = iter_csv_ticks(str(path), chunk_size=16)
+    # Lazy: nothing is read until the generator is consumed
+    assert not isinstance(streamed, list)
+    assert list(streamed) == read_csv_to_immutable_list(str(path), cache=False)
+
+
+
+def _write_xml(path):
+    path.write_text(
+        "<instruments>"
+        "<instrument><symbol>MSFT</symbol><price>328.10</price><timestamp>2025-10-01T09:30:00Z</timestamp></instrument>"
+        "<instrument><symbol>AAPL</symbol><price>172.35</price><timestamp>2025-10-01T09:30:01Z</timestamp></instrument>"
+        "<instrument><symbol>MSFT</symbol><price>329.00</price><timestamp>2025-10-01T09:31:00Z</timestamp></instrument>"
+        "</instruments>"
+    )
+
+
+def test_bloomberg_streaming_and_index_modes(tmp_path):
+    path = tmp_path / "bloomberg.xml"
+    _write_xml(path)
+
+    points = list(iter_bloomberg_xml(str(path)))
+    assert [(p.symbol, p.price) for p in points] == [("MSFT", 328.10), ("AAPL", 172.35), ("MSFT", 329.00)]
+
+    indexed = BloombergXMLAdapter(str(path), mode="index", cache=False)
+    streamed = BloombergXMLAdapter(str(path), mode="stream")
+    for adapter in (indexed, streamed):
+        assert adapter.get_data("MSFT") == points[2]   # last occurrence wins
+        assert adapter.get_data("AAPL") == points[1]
+        assert adapter.get_data("TSLA") is None
+    assert list(streamed.iter_data()) == points
+
+
+def test_bloomberg_single_instrument_file_all_modes():
+    path = os.path.join(os.path.dirname(__file__), "..", "data", "external_data_bloomberg.xml")
+    expected = BloombergXMLAdapter(path, cache=False).get_data("MSFT")
+    assert expected is not None
+    for mode in ("index", "stream"):
+        assert BloombergXMLAdapter(path, mode=mode, cache=False).get_data("MSFT") == expected
+
+
+def test_yahoo_jsonl_offset_index(tmp_path):
+    path = tmp_path / "yahoo.jsonl"
+    path.write_text(
+        '{"ticker": "META", "last_price": 712.35, "timestamp": "2025-10-01T09:30:00Z"}\n'
+        '{"ticker": "AAPL", "last_price": 172.35, "timestamp": "2025-10-01T09:30:00Z"}\n'
+    )
+    with YahooFinanceAdapter(str(path), mode="jsonl") as yahoo:
+        assert yahoo.get_data("AAPL").price == 172.35
+        assert yahoo.get_data("META").timestamp.isoformat() == "2025-10-01T09:30:00+00:00"
+        assert yahoo.get_data("TSLA") is None
+    assert os.path.exists(str(path) + ".idx")
+
+    # Appending a record changes size/mtime, so the index is rebuilt
+    with open(path, "a") as f:
+        f.write('{"ticker": "TSLA", "last_price": 250.0, "timestamp": "2025-10-01T09:31:00Z"}\n')
+    with YahooFinanceAdapter(str(path), mode="jsonl") as yahoo:
+        assert yahoo.get_data("TSLA").price == 250.0
+        assert sorted(yahoo.symbols()) == ["AAPL", "META", "TSLA"]
+
+
+def test_get_many_is_columnar_with_missing_list(tmp_path):
+    xml = tmp_path / "bloomberg.xml"
+    _write_xml(xml)
+    jsonl = tmp_path / "yahoo.jsonl"
+    jsonl.write_text(
+        '{"ticker": "META", "last_price": 712.35, "timestamp": "2025-10-01T09:30:00Z"}\n'
+        '{"ticker": "AAPL", "last_price": 172.35, "timestamp": "2025-10-01T09:30:00Z"}\n'
+    )
+    adapters = [BloombergXMLAdapter(str(xml), mode=m, cache=False) for m in ("index", "stream")]
+    adapters.append(YahooFinanceAdapter(str(jsonl), mode="jsonl"))
+    for adapter in adapters:
+        frame, missing = adapter.get_many(["AAPL", "TSLA", "MSFT", "META"])
+        assert missing == [s for s in ("TSLA", "MSFT", "META") if adapter.get_data(s) is None]
+        assert list(frame.index) == [s for s in ("AAPL", "MSFT", "META") if s not in missing]
+        for sym, row in frame.iterrows():
+            point = adapter.get_data(sym)
+            assert row["price"] == point.price
+            assert row["timestamp"].to_pydatetime() == point.timestamp
+
+    frame, missing = BloombergXMLAdapter(os.path.join(os.path.dirname(__file__), "..", "data",
+                                                      "external_data_bloomberg.xml"), cache=False).get_many(["MSFT", "X"])
+    assert list(frame.index) == ["MSFT"] and missing == ["X"]
+
+
+def test_merge_ticks_orders_sources_and_applies_policies():
+    from datetime import datetime, timezone
+    import pytest
+    from models import MarketDataPoint
+    from data_loader import merge_ticks
+
+    t = lambda m: datetime(2025, 10, 1, 9, m)
+    csv_src = [MarketDataPoint(t(30), "MSFT", 1.0), MarketDataPoint(t(31), "AAPL", 2.0), MarketDataPoint(t(33), "AAPL", 3.0)]
+    # aware UTC timestamps merge with naive ones (naive taken as UTC)
+    feed = [MarketDataPoint(t(30).replace(tzinfo=timezone.utc), "AAPL", 10.0),
+            MarketDataPoint(t(31).replace(tzinfo=timezone.utc), "AAPL", 20.0),
+            MarketDataPoint(t(32).replace(tzinfo=timezone.utc), "MSFT", 30.0)]
+
+    merged = list(merge_ticks(iter(csv_src), iter(feed)))
+    assert [p.price for p in merged] == [1.0, 10.0, 2.0, 20.0, 30.0, 3.0]
+    assert [p.price for p in merge_ticks(csv_src, feed, tie_break="symbol")] == [10.0, 1.0, 2.0, 20.0, 30.0, 3.0]
+    assert [p.price for p in merge_ticks(csv_src, feed, duplicates="first")] == [1.0, 10.0, 2.0, 30.0, 3.0]
+    assert [p.price for p in merge_ticks(csv_src, feed, duplicates="last")] == [1.0, 10.0, 20.0, 30.0, 3.0]
+    with pytest.raises(ValueError):
+        list(merge_ticks(csv_src, feed, duplicates="error"))
+    with pytest.raises(ValueError):
+        list(merge_ticks(csv_src[::-1]))
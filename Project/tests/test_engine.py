@@ -0,0 +1,119 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from engine import Engine
+from models import Broker
+from patterns.Observer import SignalPublisher
+from patterns.Strategy import MeanReversionStrategy
+from helpers import make_ticks
+
+
+class _Recorder:
+    def __init__(self):
+        self.signals = []
+
+    def update(self, signal: dict):
+        self.signals.append(signal)
+
+
+def _engine():
+    pub = SignalPublisher()
+    rec = _Recorder()
+    pub.attach(rec)
+    engine = Engine(MeanReversionStrategy(lookback_window=5, threshold=0.01), Broker(10_000), pub)
+    return engine, rec
+
+
+def test_run_sharded_matches_single_process():
+    ticks = make_ticks()
+
+    serial, serial_rec = _engine()
+    serial.run(ticks)
+
+    sharded, sharded_rec = _engine()
+    sharded.run_sharded(ticks, n_workers=3)
+
+    a, b = serial.broker.summary(), sharded.broker.summary()
+    assert b["n_trades"] == a["n_trades"] > 0
+    assert abs(b["cash"] - a["cash"]) < 1e-6
+    assert abs(b["equity"] - a["equity"]) < 1e-6
+    assert b["positions"] == a["positions"]  # same order, too
+    assert sharded.broker.trades == serial.broker.trades
+    assert sharded_rec.signals == serial_rec.signals
+
+    # Merged commands still support undo
+    cash = sharded.broker.cash
+    sharded.undo_last()
+    assert sharded.broker.cash != cash
+
+
+def test_run_sharded_in_chunks_continues_the_session():
+    ticks = make_ticks()
+
+    serial, serial_rec = _engine()
+    serial.run(ticks)
+
+    sharded, sharded_rec = _engine()
+    sharded.run_sharded(ticks[:1700], n_workers=3)
+    assert len(sharded.strategy.prices) == 6  # worker state was merged back
+    sharded.run_sharded(ticks[1700:], n_workers=3)
+
+    a, b = serial.broker.summary(), sharded.broker.summary()
+    assert b["n_trades"] == a["n_trades"]
+    assert abs(b["cash"] - a["cash"]) < 1e-6
+    assert b["positions"] == a["positions"]  # seeded positions keep their slots
+    assert sharded.broker.trades == serial.broker.trades
+    assert sharded_rec.signals == serial_rec.signals
+
+
+def test_run_sharded_feeds_streaming_analytics():
+    from analytics import StreamingAnalytics
+
+    ticks = make_ticks()
+    serial = Engine(MeanReversionStrategy(5, 0.01), Broker(10_000), analytics=StreamingAnalytics("SPY"))
+    serial.run(ticks)
+
+    sharded = Engine(MeanReversionStrategy(5, 0.01), Broker(10_000), analytics=StreamingAnalytics("SPY"))
+    sharded.run_sharded(ticks[:1700], n_workers=3)
+    sharded.run_sharded(ticks[1700:], n_workers=3)
+
+    expected = serial.analytics.snapshot()
+    assert expected["AAPL"]["beta"] is not None
+    assert sharded.analytics.snapshot() == expected
+
+
+def test_multi_strategy_engine_matches_separate_runs():
+    from engine import MultiStrategyEngine
+    from patterns.Strategy import BreakoutStrategy
+
+    ticks = make_ticks(1500)
+    make = lambda: [BreakoutStrategy(5, 0.01), MeanReversionStrategy(5, 0.01), MeanReversionStrategy(10, 0.02)]
+
+    multi = MultiStrategyEngine.from_strategies(make(), starting_cash=10_000, publisher_factory=SignalPublisher)
+    multi.run(iter(ticks))  # a one-shot iterator is enough: each tick is read once
+
+    expected = []
+    for strat in make():
+        e = Engine(strat, Broker(10_000))
+        e.run(ticks)
+        expected.append(e.broker.summary())
+
+    summaries = multi.summaries()
+    assert list(summaries) == ["BreakoutStrategy", "MeanReversionStrategy", "MeanReversionStrategy#2"]
+    assert list(summaries.values()) == expected
+    assert len({id(e.broker) for e in multi.engines}) == 3
+
+
+def test_engine_runs_on_merged_sources():
+    from data_loader import merge_ticks
+
+    ticks = make_ticks(1200)
+    evens, odds = ticks[0::2], ticks[1::2]
+
+    expected, _ = _engine()
+    expected.run(ticks)
+    merged, _ = _engine()
+    merged.run(merge_ticks(iter(odds), iter(evens)))
+    assert merged.broker.summary() == expected.broker.summary()
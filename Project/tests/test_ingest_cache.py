@@ -0,0 +1,64 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_loader import read_csv_to_immutable_list, read_instruments, YahooFinanceAdapter, BloombergXMLAdapter
+from ingest_cache import IngestCache
+from patterns.Builder import PortfolioBuilder
+
+DATA = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def test_unchanged_file_is_served_from_cache(tmp_path):
+    path = tmp_path / "market_data.csv"
+    path.write_text(
+        "timestamp,symbol,price\n"
+        "2025-10-01T09:30:00,AAPL,172.35\n"
+        "2025-10-01T09:30:01.250000,MSFT,328.10\n"
+    )
+    cache = IngestCache(str(tmp_path / "cache"))
+    first = read_csv_to_immutable_list(str(path), cache=cache)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert read_csv_to_immutable_list(str(path), cache=cache) == first
+    assert read_csv_to_immutable_list(str(path), cache=False) == first
+    assert cache.hits == 1
+
+    # Touching the file without changing it is still a hit (content hash matches)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10_000_000))
+    assert read_csv_to_immutable_list(str(path), cache=cache) == first
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Changing the content invalidates the entry
+    with open(path, "a") as f:
+        f.write("2025-10-01T09:30:02,AAPL,172.40\n")
+    again = read_csv_to_immutable_list(str(path), cache=cache)
+    assert len(again) == 3 and cache.misses == 2
+
+
+def test_cached_loaders_match_uncached(tmp_path):
+    cache = IngestCache(str(tmp_path))
+    for _ in range(2):  # miss, then hit
+        assert read_instruments(os.path.join(DATA, "instruments.csv"), cache=cache) == \
+            read_instruments(os.path.join(DATA, "instruments.csv"), cache=False)
+        yahoo = YahooFinanceAdapter(os.path.join(DATA, "external_data_yahoo.json"), cache=cache)
+        assert yahoo.get_data("META").price == 712.35
+        for mode in ("tree", "index"):
+            bloomberg = BloombergXMLAdapter(os.path.join(DATA, "external_data_bloomberg.xml"), mode=mode, cache=cache)
+            assert bloomberg.get_data("MSFT").price == 328.10
+        portfolio = PortfolioBuilder.from_json(os.path.join(DATA, "portfolio_structure.json"), cache=cache)
+        expected = PortfolioBuilder.from_json(os.path.join(DATA, "portfolio_structure.json"), cache=False)
+        assert portfolio.get_value() == expected.get_value()
+    assert cache.hits == cache.misses == 5
+
+
+def test_entries_writable_by_others_are_not_trusted(tmp_path):
+    path = tmp_path / "instruments.csv"
+    path.write_text("symbol,type\nAAPL,Stock\n")
+    cache = IngestCache(str(tmp_path / "cache"))
+    read_instruments(str(path), cache=cache)
+    entry = cache._entry_path(str(path), "csv_rows/1")
+    os.chmod(entry, 0o666)
+    assert read_instruments(str(path), cache=cache) == [{"symbol": "AAPL", "type": "Stock"}]
+    assert (cache.hits, cache.misses) == (0, 2)
@@ -0,0 +1,128 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from engine import Engine
+from journal import CommandJournal, recover
+from models import Broker
+from patterns.Strategy import MeanReversionStrategy
+from helpers import make_ticks
+
+
+def _state(broker, invoker):
+    s = broker.summary()
+    s.pop("equity")  # marks come from the price feed, not the journal
+    s["positions"] = sorted((p["symbol"], p["qty"]) for p in s["positions"])
+    return s, broker.trades, len(invoker.done), len(invoker.undone), [[o["price"] for o in getattr(c, "orders", None) or [c.order]] for c in invoker.done]
+
+
+def _run(path, snapshot_every):
+    broker = Broker(10_000)
+    journal = CommandJournal(str(path), broker, fsync_every=50, snapshot_every=snapshot_every)
+    engine = Engine(MeanReversionStrategy(5, 0.01), broker, journal=journal)
+    engine.run(make_ticks(1200))
+    engine.undo_last()
+    engine.undo_last()
+    engine.redo_last()
+    journal.flush()  # everything up to here is durable; then the process "dies"
+    return engine
+
+
+def test_recover_rebuilds_broker_and_history(tmp_path):
+    path = tmp_path / "orders.journal"
+    engine = _run(path, snapshot_every=0)
+    assert not os.path.exists(str(path) + ".snap")
+
+    broker, invoker = recover(str(path))
+    assert _state(broker, invoker) == _state(engine.broker, engine.invoker)
+
+    # Recovered history is live: undo works on it
+    invoker.undo()
+    engine.undo_last()
+    assert broker.summary()["cash"] == engine.broker.summary()["cash"]
+
+
+def test_recover_from_snapshot_and_ignores_torn_tail(tmp_path):
+    path = tmp_path / "orders.journal"
+    engine = _run(path, snapshot_every=100)
+    assert os.path.exists(str(path) + ".snap")
+
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")  # half-written record from the crash
+
+    broker, invoker = recover(str(path))
+    assert _state(broker, invoker) == _state(engine.broker, engine.invoker)
+
+
+def test_recover_replays_batches_atomically(tmp_path):
+    from patterns.Command import BatchOrderCommand, CommandInvoker
+
+    path = tmp_path / "orders.journal"
+    broker = Broker(1_000)
+    journal = CommandJournal(str(path), broker, fsync_every=1, snapshot_every=0)
+    invoker = CommandInvoker(journal=journal)
+    orders = [{"timestamp": "t1", "symbol": s, "side": "BUY", "qty": 1, "price": 10.0} for s in "ABA"]
+    invoker.do(BatchOrderCommand(broker, orders))
+    invoker.do(BatchOrderCommand(broker, orders))
+    journal.close()
+
+    rec_broker, rec_invoker = recover(str(path))
+    assert _state(rec_broker, rec_invoker) == _state(broker, invoker)
+    assert all(isinstance(c, BatchOrderCommand) for c in rec_invoker.done)
+
+    # Cut the file inside the second batch: it is dropped as a whole
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) - 10])
+    rec_broker, rec_invoker = recover(str(path))
+    assert len(rec_invoker.done) == 1
+    assert rec_broker.cash == 970.0
+
+
+def test_reopen_after_crash_truncates_torn_tail(tmp_path):
+    from patterns.Command import CommandInvoker, ExecuteOrderCommand
+
+    path = tmp_path / "orders.journal"
+    order = {"timestamp": "t1", "symbol": "AAPL", "side": "BUY", "qty": 1, "price": 10.0}
+    broker = Broker(1_000)
+    journal = CommandJournal(str(path), broker, fsync_every=1, snapshot_every=0)
+    CommandInvoker(journal=journal).do(ExecuteOrderCommand(broker, order))
+    journal.close()
+    with open(path, "ab") as f:
+        f.write(b"\x40\x00\x00\x00garbage")  # torn record from the crash
+
+    # The resumed process keeps journaling behind the recovered state
+    broker, invoker = recover(str(path))
+    journal = CommandJournal(str(path), broker, fsync_every=1, snapshot_every=0)
+    invoker.journal = journal
+    invoker.do(ExecuteOrderCommand(broker, dict(order, timestamp="t2")))
+    journal.close()
+
+    rec_broker, rec_invoker = recover(str(path))
+    assert rec_broker.cash == broker.cash == 980.0
+    assert len(rec_invoker.done) == 2
+
+
+def test_snapshots_stay_compact_and_trades_are_written_incrementally(tmp_path):
+    path = tmp_path / "orders.journal"
+    broker = Broker(10_000)
+    journal = CommandJournal(str(path), broker, fsync_every=50, snapshot_every=100, undo_window=20)
+    engine = Engine(MeanReversionStrategy(5, 0.01), broker, journal=journal)
+    ticks = make_ticks(3000)
+    engine.run(ticks[:1500])
+    snap_size = os.path.getsize(str(path) + ".snap")
+    engine.run(ticks[1500:])
+    for _ in range(30):  # undo past the window into folded history
+        engine.undo_last()
+    journal.snapshot(engine.invoker)
+    journal.flush()
+
+    # Snapshot size does not grow with the number of trades
+    assert os.path.getsize(str(path) + ".snap") < 2 * snap_size
+
+    rec_broker, rec_invoker = recover(str(path))
+    assert _state(rec_broker, rec_invoker)[0] == _state(engine.broker, engine.invoker)[0]
+    assert rec_broker.trades == engine.broker.trades
+    n_live = len(engine.invoker.done)
+    assert 20 <= len(rec_invoker.done) <= 60
+    assert rec_invoker.checkpoint.n_commands + len(rec_invoker.done) == n_live
@@ -43,4 +43,144 @@ def test_observer_attach_detach_notify():
     # A should have 2 notifications, B should still have 1
     assert len(a.signals) == 2
     assert len(b.signals) == 1
-    assert a.signals[-1]["action"] == "SELL"
\ No newline at end of file
+    assert a.signals[-1]["action"] == "SELL"
+
+class SlowObserver(TestObserver):
+    """Blocks in update() until released, to fill up the async queue."""
+    def __init__(self, name):
+        super().__init__(name)
+        import threading
+        self.release = threading.Event()
+
+    def update(self, signal: dict):
+        self.release.wait(5)
+        super().update(signal)
+
+
+def _sig(i, symbol="ADSK"):
+    return {"timestamp": f"t{i}", "symbol": symbol, "action": "BUY", "price": 100.0 + i, "qty": 1}
+
+
+def test_async_publisher_delivers_everything_on_close():
+    from patterns.Observer import AsyncSignalPublisher
+
+    a = TestObserver("A")
+    b = TestObserver("B")
+    with AsyncSignalPublisher(maxsize=8, policy="block") as pub:
+        pub.attach(a)
+        pub.attach(b)
+        for i in range(500):
+            pub.notify(_sig(i))
+    assert [s["timestamp"] for s in a.signals] == [f"t{i}" for i in range(500)]
+    assert len(b.signals) == 500
+
+
+def test_async_publisher_drop_oldest_and_coalesce():
+    from patterns.Observer import AsyncSignalPublisher
+
+    slow = SlowObserver("slow")
+    pub = AsyncSignalPublisher(maxsize=3, policy="drop_oldest")
+    pub.attach(slow)
+    for i in range(10):
+        pub.notify(_sig(i))  # never blocks even though the observer is stuck
+    slow.release.set()
+    pub.close()
+    # Whatever was in flight, plus the newest 3
+    assert [s["timestamp"] for s in slow.signals][-3:] == ["t7", "t8", "t9"]
+    assert pub.dropped() + len(slow.signals) == 10
+
+    slow = SlowObserver("slow")
+    pub = AsyncSignalPublisher(maxsize=100, policy="coalesce")
+    pub.attach(slow)
+    pub.notify(_sig(0, "HOLD"))  # occupies the worker
+    import time
+    time.sleep(0.05)
+    for i in range(1, 6):
+        pub.notify(_sig(i, "AAPL"))
+        pub.notify(_sig(i, "MSFT"))
+    slow.release.set()
+    pub.close()
+    got = [(s["symbol"], s["timestamp"]) for s in slow.signals]
+    assert got == [("HOLD", "t0"), ("AAPL", "t5"), ("MSFT", "t5")]
+
+
+def test_filtered_subscriptions_only_reach_matching_observers():
+    pub = SignalPublisher()
+    everything = TestObserver("all")
+    aapl = TestObserver("aapl")
+    sells = TestObserver("sells")
+    big_msft_buys = TestObserver("big")
+
+    pub.attach(big_msft_buys, symbols=["MSFT"], actions="BUY", min_notional=1000)
+    pub.attach(everything)
+    pub.attach(aapl, symbols="AAPL")
+    pub.attach(sells, actions=["sell"])
+
+    pub.notify({"timestamp": "t1", "symbol": "AAPL", "action": "BUY", "price": 10.0, "qty": 1})
+    pub.notify({"timestamp": "t2", "symbol": "MSFT", "action": "BUY", "price": 100.0, "qty": 5})
+    pub.notify({"timestamp": "t3", "symbol": "MSFT", "action": "BUY", "price": 100.0, "qty": 20})
+    pub.notify({"timestamp": "t4", "symbol": "MSFT", "action": "SELL", "price": 100.0, "qty": 20})
+
+    ts = lambda o: [s["timestamp"] for s in o.signals]
+    assert ts(everything) == ["t1", "t2", "t3", "t4"]
+    assert ts(aapl) == ["t1"]
+    assert ts(sells) == ["t4"]
+    assert ts(big_msft_buys) == ["t3"]
+
+    # Matches are delivered in attach order
+    order = []
+    for name in ("x", "y"):
+        o = TestObserver(name)
+        o.update = lambda sig, n=name: order.append(n)
+        pub.attach(o, min_notional=5 if name == "x" else None)
+    pub.notify({"timestamp": "t5", "symbol": "ZTS", "action": "BUY", "price": 10.0, "qty": 1})
+    assert order == ["x", "y"]
+
+    pub.detach(big_msft_buys)
+    pub.notify({"timestamp": "t6", "symbol": "MSFT", "action": "BUY", "price": 100.0, "qty": 20})
+    assert ts(big_msft_buys) == ["t3"]
+
+
+def test_batched_logger_writes_everything_on_close(tmp_path):
+    from reporting import BatchedLoggerObserver
+
+    path = tmp_path / "signals.log"
+    obs = BatchedLoggerObserver(path=str(path), flush_interval=10, batch_size=64)
+    pub = SignalPublisher()
+    pub.attach(obs)
+    for i in range(1000):
+        pub.notify({"timestamp": f"t{i}", "symbol": "ADSK", "action": "BUY", "price": 100.0})
+
+    obs.flush()
+    assert len(path.read_text().splitlines()) == 1000
+    pub.notify({"timestamp": "t1000", "symbol": "ADSK", "action": "SELL", "price": 101.0})
+    obs.close()
+
+    lines = path.read_text().splitlines()
+    assert len(lines) == 1001
+    assert lines[0] == "[LOG] t0 | ADSK | BUY @ 100.0"
+    assert lines[-1] == "[LOG] t1000 | ADSK | SELL @ 101.0"
+
+
+def test_batched_logger_survives_a_failed_write():
+    import io
+    from reporting import BatchedLoggerObserver
+
+    class FlakyStream(io.StringIO):
+        fail = True
+
+        def write(self, text):
+            if self.fail:
+                self.fail = False
+                raise OSError("disk full")
+            return super().write(text)
+
+    stream = FlakyStream()
+    obs = BatchedLoggerObserver(stream=stream, flush_interval=10, batch_size=1)
+    obs.update({"timestamp": "t0", "symbol": "ADSK", "action": "BUY", "price": 100.0})
+    assert obs.flush(timeout=5)  # the failed batch is dropped, the writer keeps running
+    obs.update({"timestamp": "t1", "symbol": "ADSK", "action": "SELL", "price": 101.0})
+    assert obs.flush(timeout=5)
+    assert stream.getvalue() == "[LOG] t1 | ADSK | SELL @ 101.0\n"
+    obs.close()
+    assert obs.flush() is False  # closed: returns at once instead of blocking
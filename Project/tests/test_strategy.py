@@ -53,3 +53,32 @@ def test_mean_reversion_strategy_signals_expected_behavior():
     # Expect one SELL signal due to overvaluation
     assert any(s["action"] == "SELL" for s in signals), "Expected a SELL signal for mean reversion"
 
+
+
+def _tick_path(strat, prices):
+    idx, actions = [], []
+    for i, px in enumerate(prices):
+        for s in strat.generate_signals(MarketDataPoint(i, "SYM", px)):
+            idx.append(i)
+            actions.append(s["action"])
+    return idx, actions
+
+
+def test_batch_signals_match_tick_path_on_random_data():
+    """The vectorized batch API must reproduce the tick-by-tick signals exactly."""
+    import numpy as np
+
+    rng = np.random.default_rng(7)
+    for trial in range(40):
+        size = int(rng.integers(0, 400))
+        prices = 100.0 * np.exp(np.cumsum(rng.normal(0, 0.02, size)))
+        if trial % 5 == 0 and size:
+            prices[rng.integers(0, size, 3)] = 0.0  # exercise the prev_price <= 0 reset
+        n = int(rng.integers(1, 30))
+        thr = float(rng.uniform(0.0, 0.05))
+
+        for cls in (BreakoutStrategy, MeanReversionStrategy):
+            exp_idx, exp_act = _tick_path(cls(lookback_window=n, threshold=thr), prices.tolist())
+            idx, act = cls(lookback_window=n, threshold=thr).generate_signals_batch(prices, np.arange(size))
+            assert idx.tolist() == exp_idx
+            assert act.tolist() == exp_act
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from engine import Engine
+from models import Broker
+from sweep import _fingerprint, _ticks_to_columns, expand_grid, run_sweep
+from helpers import make_ticks
+
+
+def test_expand_grid_fills_from_base_params():
+    runs = expand_grid({"BreakoutStrategy": {"threshold": [0.01, 0.02]}},
+                       {"BreakoutStrategy": {"lookback_window": 15, "threshold": 0.03}})
+    assert runs == [("BreakoutStrategy", {"lookback_window": 15, "threshold": 0.01}),
+                    ("BreakoutStrategy", {"lookback_window": 15, "threshold": 0.02})]
+
+
+def test_run_sweep_ranks_and_resumes(tmp_path):
+    from patterns.Strategy import MeanReversionStrategy
+
+    ticks = make_ticks(600)
+    grids = {"MeanReversionStrategy": {"lookback_window": [5, 10], "threshold": [0.005, 0.01]}}
+    out = str(tmp_path / "results.csv")
+    progress = out + ".progress"
+
+    # Pretend an earlier, interrupted run on the same inputs already finished one parameter set.
+    fake = {"strategy": "MeanReversionStrategy", "params": {"lookback_window": 5, "threshold": 0.005},
+            "equity": 1e9, "pnl": 1e9, "n_trades": -1}
+    fingerprint = _fingerprint(*_ticks_to_columns(ticks), 10_000, {})
+    with open(progress, "w") as f:
+        f.write(json.dumps({"fingerprint": fingerprint}) + "\n")
+        f.write(json.dumps(fake) + "\n")
+
+    ranked = run_sweep(ticks, grids, out, starting_cash=10_000, n_workers=2, params_path=None)
+    assert len(ranked) == 4
+    assert ranked[0]["n_trades"] == -1  # taken from progress, not recomputed
+    assert [r["pnl"] for r in ranked] == sorted((r["pnl"] for r in ranked), reverse=True)
+
+    # A finished run matches a plain single-process backtest
+    row = next(r for r in ranked if r["params"] == {"lookback_window": 10, "threshold": 0.01})
+    e = Engine(MeanReversionStrategy(10, 0.01), Broker(10_000))
+    e.run(ticks)
+    assert row["n_trades"] == len(e.broker.trades)
+    assert abs(row["equity"] - e.broker.equity()) < 1e-6
+
+    with open(progress) as f:
+        assert len(f.readlines()) == 5  # fingerprint + 4 rows
+    with open(out) as f:
+        assert len(f.readlines()) == 5
+
+    # Different starting cash: the old rows are not reused
+    ranked = run_sweep(ticks, grids, out, starting_cash=20_000, n_workers=2, params_path=None)
+    assert all(r["n_trades"] >= 0 for r in ranked)
+    with open(progress) as f:
+        lines = f.readlines()
+    assert len(lines) == 5 and json.loads(lines[0])["fingerprint"] != fingerprint
@@ -0,0 +1,95 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from data_loader import read_csv_to_immutable_list
+from ingest_cache import IngestCache
+from tick_store import TickStore, iter_cached_ticks
+
+
+def test_tick_store_round_trip(tmp_path):
+    csv_path = tmp_path / "market_data.csv"
+    csv_path.write_text(
+        "timestamp,symbol,price\n"
+        "2025-10-01T09:30:00,AAPL,172.35\n"
+        "2025-10-01T09:30:01.250000,MSFT,328.10\n"
+        "2025-10-01T09:30:02,AAPL,172.40\n"
+    )
+    expected = read_csv_to_immutable_list(str(csv_path), cache=False)
+
+    store = TickStore.build(str(csv_path), str(tmp_path / "store"), chunk_rows=2)
+    assert len(store) == 3
+    assert list(store.iter_ticks(block_rows=2)) == expected
+
+    # Per-symbol slice comes from the symbol index
+    ts, px = store.symbol_slice("AAPL")
+    assert px.tolist() == [172.35, 172.40]
+    assert list(store.iter_ticks("MSFT")) == [expected[1]]
+    assert store.symbol_slice("NOPE")[1].size == 0
+
+    # Reopening an unchanged CSV reuses the existing store
+    reopened = TickStore.open_or_build(str(csv_path), str(tmp_path / "store"))
+    assert list(reopened.iter_ticks()) == expected
+
+
+def test_open_or_build_recovers_from_a_broken_store(tmp_path):
+    csv_path = tmp_path / "market_data.csv"
+    csv_path.write_text("timestamp,symbol,price\n2025-10-01T09:30:00,AAPL,172.35\n2025-10-01T09:30:01,MSFT,328.10\n")
+    store_dir = tmp_path / "store"
+    TickStore.build(str(csv_path), str(store_dir))
+    assert sorted(os.listdir(tmp_path)) == ["market_data.csv", "store"]  # no temp dirs left behind
+
+    # Corrupt meta.json: treated as missing, not raised
+    (store_dir / "meta.json").write_text("{\"n\": ")
+    assert len(TickStore.open_or_build(str(csv_path), str(store_dir))) == 2
+
+    # Truncated column file under a valid meta.json
+    (store_dir / "prices.bin").write_bytes(b"")
+    store = TickStore.open_or_build(str(csv_path), str(store_dir))
+    assert store.prices.tolist() == [172.35, 328.10]
+
+    # A build that fails part-way leaves the previous store intact
+    bad = tmp_path / "bad.csv"
+    bad.write_text("timestamp,symbol,price\n2025-10-01T09:30:00,AAPL,oops\n")
+    with pytest.raises(ValueError):
+        TickStore.build(str(bad), str(store_dir))
+    assert TickStore(str(store_dir)).prices.tolist() == [172.35, 328.10]
+    assert sorted(os.listdir(tmp_path)) == ["bad.csv", "market_data.csv", "store"]
+
+
+def test_build_rejects_mixed_timezone_awareness(tmp_path):
+    csv_path = tmp_path / "market_data.csv"
+    csv_path.write_text(
+        "timestamp,symbol,price\n"
+        "2025-10-01T09:30:00+00:00,AAPL,172.35\n"
+        "2025-10-01T09:30:01,MSFT,328.10\n"
+    )
+    with pytest.raises(ValueError, match="row 2"):
+        TickStore.build(str(csv_path), str(tmp_path / "store"))
+    assert not (tmp_path / "store").exists()
+
+
+def test_iter_cached_ticks_hits_on_second_run(tmp_path, monkeypatch):
+    csv_path = tmp_path / "market_data.csv"
+    csv_path.write_text("timestamp,symbol,price\n2025-10-01T09:30:00,AAPL,172.35\n2025-10-01T09:30:01,MSFT,328.10\n")
+    expected = read_csv_to_immutable_list(str(csv_path), cache=False)
+    cache = IngestCache(str(tmp_path / "cache"))
+
+    assert list(iter_cached_ticks(str(csv_path), cache=cache)) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+
+    # Second run: served from the store, no CSV parse and no rebuild
+    monkeypatch.setattr("tick_store.iter_csv_ticks", lambda *a, **k: pytest.fail("CSV re-parsed"))
+    assert list(iter_cached_ticks(str(csv_path), cache=cache)) == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+    monkeypatch.undo()
+
+    # Editing the CSV rebuilds
+    with open(csv_path, "a") as f:
+        f.write("2025-10-01T09:30:02,AAPL,172.40\n")
+    assert len(list(iter_cached_ticks(str(csv_path), cache=cache))) == 3
+    assert cache.misses == 2
+    assert list(iter_cached_ticks(str(csv_path), cache=False)) == list(iter_cached_ticks(str(csv_path), cache=cache))
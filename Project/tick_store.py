@@ -0,0 +1,229 @@
+# tick_store.py
+import json
+import os
+import shutil
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from data_loader import iter_csv_ticks
+from ingest_cache import DEFAULT_CACHE
+from models import MarketDataPoint
+
+_EPOCH = datetime(1970, 1, 1)
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# column name -> dtype of the raw file on disk
+_COLUMNS = {
+    "timestamps": np.int64,   # epoch nanoseconds
+    "symbol_ids": np.int32,   # index into meta["symbols"]
+    "prices": np.float64,
+}
+
+
+def _to_epoch_ns(ts: datetime) -> int:
+    delta = ts - (_EPOCH_UTC if ts.tzinfo is not None else _EPOCH)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000_000 + delta.microseconds * 1_000
+
+
+def _from_epoch_ns(ns: int, tz_aware: bool) -> datetime:
+    return (_EPOCH_UTC if tz_aware else _EPOCH) + timedelta(microseconds=ns // 1_000)
+
+
+class TickStore:
+    """
+    Columnar binary tick store.
+
+    A market data CSV is converted once into flat int64/int32/float64 column
+    files. Later runs open them with numpy.memmap, so reads are zero-copy, and a
+    symbol index (rows grouped by symbol + offsets) gives per-symbol slices
+    without scanning the whole file.
+    """
+
+    def __init__(self, store_dir: str):
+        meta_path = os.path.join(store_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(f"Tick store not found: {store_dir}")
+        with open(meta_path, "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+
+        self.store_dir = store_dir
+        self.symbols = list(self.meta["symbols"])
+        self.symbol_to_id = {s: i for i, s in enumerate(self.symbols)}
+        self.tz_aware = bool(self.meta["tz_aware"])
+
+        n = int(self.meta["n"])
+        for name, dtype in _COLUMNS.items():
+            setattr(self, name, self._open_column(name, dtype, n))
+        self.order = self._open_column("order", np.int64, n)
+        self.offsets = self._open_column("offsets", np.int64, len(self.symbols) + 1)
+
+    def _open_column(self, name, dtype, n):
+        if n == 0:
+            return np.empty(0, dtype=dtype)  # np.memmap refuses empty files
+        return np.memmap(os.path.join(self.store_dir, f"{name}.bin"), dtype=dtype, mode="r", shape=(n,))
+
+    def __len__(self):
+        return int(self.meta["n"])
+
+    # ---------- building ----------
+
+    @staticmethod
+    def build(csv_path: str, store_dir: str, chunk_rows: int = 1_000_000) -> "TickStore":
+        """
+        Convert a market data CSV into the columnar store and open it.
+
+        The store is written to a temporary sibling directory and swapped into
+        place only once complete, so a crash mid-build never leaves a
+        meta.json next to partial columns.
+        """
+        store_dir = os.path.abspath(store_dir)
+        tmp_dir = f"{store_dir}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        try:
+            TickStore._write(csv_path, tmp_dir, chunk_rows)
+            if os.path.exists(store_dir):
+                old_dir = f"{store_dir}.{os.getpid()}.old"
+                os.rename(store_dir, old_dir)
+                os.rename(tmp_dir, store_dir)
+                shutil.rmtree(old_dir, ignore_errors=True)
+            else:
+                os.rename(tmp_dir, store_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return TickStore(store_dir)
+
+    @staticmethod
+    def _write(csv_path: str, store_dir: str, chunk_rows: int):
+        symbol_to_id = {}
+        tz_aware = None
+        n = 0
+
+        files = {name: open(os.path.join(store_dir, f"{name}.bin"), "wb") for name in _COLUMNS}
+        try:
+            ts_buf, sym_buf, px_buf = [], [], []
+
+            def flush():
+                files["timestamps"].write(np.asarray(ts_buf, dtype=np.int64).tobytes())
+                files["symbol_ids"].write(np.asarray(sym_buf, dtype=np.int32).tobytes())
+                files["prices"].write(np.asarray(px_buf, dtype=np.float64).tobytes())
+                ts_buf.clear(); sym_buf.clear(); px_buf.clear()
+
+            for tick in iter_csv_ticks(csv_path):
+                aware = tick.timestamp.tzinfo is not None
+                if tz_aware is None:
+                    tz_aware = aware
+                elif aware != tz_aware:
+                    raise ValueError(
+                        f"{csv_path}: row {n + 1} mixes timezone-aware and naive timestamps ({tick.timestamp})")
+                sid = symbol_to_id.setdefault(tick.symbol, len(symbol_to_id))
+                ts_buf.append(_to_epoch_ns(tick.timestamp))
+                sym_buf.append(sid)
+                px_buf.append(tick.price)
+                n += 1
+                if len(ts_buf) >= chunk_rows:
+                    flush()
+            flush()
+        finally:
+            for f in files.values():
+                f.close()
+
+        # Symbol index: row numbers grouped by symbol (time order kept inside
+        # each group) plus the start offset of every group.
+        sym_ids = np.fromfile(os.path.join(store_dir, "symbol_ids.bin"), dtype=np.int32)
+        order = np.argsort(sym_ids, kind="stable").astype(np.int64)
+        counts = np.bincount(sym_ids, minlength=len(symbol_to_id))
+        offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        order.tofile(os.path.join(store_dir, "order.bin"))
+        offsets.tofile(os.path.join(store_dir, "offsets.bin"))
+
+        st = os.stat(csv_path)
+        meta = {
+            "n": n,
+            "symbols": list(symbol_to_id),
+            "tz_aware": bool(tz_aware),
+            "source": {"path": os.path.abspath(csv_path), "size": st.st_size, "mtime_ns": st.st_mtime_ns},
+        }
+        with open(os.path.join(store_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def open_or_build(csv_path: str, store_dir: str) -> "TickStore":
+        """Open the store if it matches csv_path's size/mtime, otherwise (or if it is unreadable) rebuild it."""
+        return TickStore.open_current(csv_path, store_dir) or TickStore.build(csv_path, store_dir)
+
+    @staticmethod
+    def open_current(csv_path: str, store_dir: str):
+        """The store in store_dir if it was built from csv_path's current size/mtime, else None."""
+        try:
+            store = TickStore(store_dir)
+            st = os.stat(csv_path)
+            src = store.meta.get("source", {})
+            if src.get("size") == st.st_size and src.get("mtime_ns") == st.st_mtime_ns:
+                return store
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            pass  # missing, truncated or corrupt store
+        return None
+
+    # ---------- reading ----------
+
+    def symbol_rows(self, symbol: str) -> np.ndarray:
+        """Row numbers (in time order) belonging to symbol."""
+        sid = self.symbol_to_id.get(symbol)
+        if sid is None:
+            return np.empty(0, dtype=np.int64)
+        return self.order[self.offsets[sid]:self.offsets[sid + 1]]
+
+    def symbol_slice(self, symbol: str):
+        """Returns (timestamps_ns, prices) arrays for a single symbol."""
+        rows = self.symbol_rows(symbol)
+        return self.timestamps[rows], self.prices[rows]
+
+    def iter_ticks(self, symbol: str = None, block_rows: int = 65_536):
+        """Yields MarketDataPoints in file order (or for one symbol) for Engine.run."""
+        if symbol is not None:
+            ts, px = self.symbol_slice(symbol)
+            for t, p in zip(ts.tolist(), px.tolist()):
+                yield MarketDataPoint(timestamp=_from_epoch_ns(t, self.tz_aware), symbol=symbol, price=p)
+            return
+
+        symbols = self.symbols
+        for start in range(0, len(self), block_rows):
+            stop = start + block_rows
+            # Pull a block of each column at once; per-element memmap indexing is slow.
+            ts = self.timestamps[start:stop].tolist()
+            sid = self.symbol_ids[start:stop].tolist()
+            px = self.prices[start:stop].tolist()
+            for t, s, p in zip(ts, sid, px):
+                yield MarketDataPoint(timestamp=_from_epoch_ns(t, self.tz_aware), symbol=symbols[s], price=p)
+
+
+def iter_cached_ticks(csv_path: str, cache=None, block_rows: int = 65_536):
+    """
+    iter_csv_ticks served from a TickStore kept in the ingest cache directory.
+
+    The first pass over a CSV builds the store; later passes over the
+    unchanged file stream it back from the memory-mapped columns instead of
+    re-parsing. Hits and misses are counted on the IngestCache (DEFAULT_CACHE
+    unless another is given); cache=False, a disabled cache or an unwritable
+    cache directory fall back to parsing the CSV.
+    """
+    cache = DEFAULT_CACHE if cache is None else cache
+    if cache is False or not cache.enabled:
+        yield from iter_csv_ticks(csv_path)
+        return
+    store_dir = os.path.splitext(cache._entry_path(csv_path, "tick_store/1"))[0]
+    store = TickStore.open_current(csv_path, store_dir)
+    if store is not None:
+        cache.hits += 1
+    else:
+        cache.misses += 1
+        try:
+            os.makedirs(cache.cache_dir, mode=0o700, exist_ok=True)
+            store = TickStore.build(csv_path, store_dir)
+        except OSError:
+            yield from iter_csv_ticks(csv_path)
+            return
+    yield from store.iter_ticks(block_rows=block_rows)
@@ -1,15 +1,126 @@
 # In data_loader.py
 import json
+import mmap # For reading single records out of large JSON-lines files
+import os
 from datetime import datetime
 from models import MarketDataPoint # Import your standard object
+import pandas as pd # For the columnar get_many() snapshots
 import xml.etree.ElementTree as ET # Import Python's built-in XML parser
 
+def _snapshot_frame(symbols: list[str], prices: list, timestamps: list) -> pd.DataFrame:
+    """Builds the columnar get_many() result: one row per symbol found.
+
+    All timestamps are parsed in a single vectorized pd.to_datetime call
+    instead of one datetime.fromisoformat per symbol.
+    """
+    return pd.DataFrame(
+        {
+            "price": pd.Series(prices, dtype=float).to_numpy(), # Accepts numbers or numeric text
+            "timestamp": pd.to_datetime(timestamps, utc=True, format="ISO8601"),
+        },
+        index=pd.Index(symbols, name="symbol", dtype=object),
+    )
+
+
 class YahooFinanceAdapter:
-    """Adapts Yahoo Finance JSON data format to MarketDataPoint objects."""
-    def __init__(self, filepath: str):
+    """Adapts Yahoo Finance JSON data format to MarketDataPoint objects.
+
+    Modes:
+      "json"  - load the whole JSON file (list of dicts or one dict) (default)
+      "jsonl" - JSON-lines file; only a symbol -> (byte offset, length) index is
+                kept, saved to index_path (default filepath + ".idx"), and each
+                get_data decodes one line through mmap. The index is rebuilt
+                automatically when the file's size or mtime changes.
+    """
+    MODES = ("json", "jsonl")
+
+    def __init__(self, filepath: str, mode: str = "json", index_path: str | None = None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
         self.filepath = filepath
-        # Store data indexed by symbol for faster lookup
-        self._data_by_symbol: dict[str, dict[str, any]] = self._load_and_index_data()
+        self.mode = mode
+        self._data_by_symbol: dict[str, dict[str, any]] = {}
+        self._offsets: dict[str, tuple[int, int]] | None = None
+        self._file = None
+        self._mm = None
+        if mode == "json":
+            # Store data indexed by symbol for faster lookup
+            self._data_by_symbol = self._load_and_index_data()
+        else:
+            self.index_path = index_path or filepath + ".idx"
+            self._offsets = self._load_or_build_offsets()
+            try:
+                self._file = open(self.filepath, 'rb')
+                if os.fstat(self._file.fileno()).st_size > 0: # mmap can't map an empty file
+                    self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except FileNotFoundError:
+                print(f"Error: Yahoo data file not found at {self.filepath}")
+
+    def _load_or_build_offsets(self) -> dict[str, tuple[int, int]]:
+        """Reuses the saved offset index if it still matches the file, otherwise rebuilds it."""
+        try:
+            st = os.stat(self.filepath)
+        except FileNotFoundError:
+            print(f"Error: Yahoo data file not found at {self.filepath}")
+            return {}
+        try:
+            with open(self.index_path, 'r') as f:
+                saved = json.load(f)
+            if saved.get("size") == st.st_size and saved.get("mtime_ns") == st.st_mtime_ns:
+                return saved["offsets"] # Index is up to date
+            print(f" -> Index for {self.filepath} is stale, rebuilding")
+        except (FileNotFoundError, KeyError, ValueError):
+            pass # No (usable) index yet
+        return self._build_offsets(st)
+
+    def _build_offsets(self, st) -> dict[str, tuple[int, int]]:
+        """Scans the JSON-lines file once, recording where each ticker's line starts."""
+        offsets = {}
+        position = 0
+        with open(self.filepath, 'rb') as f:
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        item = json.loads(line)
+                        if isinstance(item, dict) and 'ticker' in item:
+                            offsets[str(item['ticker'])] = (position, len(line)) # Last occurrence wins
+                        else:
+                            print(f"Warning: Skipping invalid line {line_number} in {self.filepath}")
+                    except json.JSONDecodeError:
+                        print(f"Warning: Could not decode line {line_number} in {self.filepath}")
+                position += len(line)
+        # Write to a temp file first so a crash never leaves a half-written index
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "offsets": offsets}, f)
+        os.replace(tmp_path, self.index_path)
+        print(f" -> Successfully indexed: {self.filepath} ({len(offsets)} symbols)")
+        return offsets
+
+    def close(self):
+        """Releases the mmap/file handle used by "jsonl" mode."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _lookup(self, symbol: str) -> dict[str, any] | None:
+        """Returns the raw record for a symbol from whichever store this mode uses."""
+        if self._offsets is None:
+            return self._data_by_symbol.get(symbol)
+        hit = self._offsets.get(symbol)
+        if hit is None or self._mm is None:
+            return None
+        start, length = hit
+        return json.loads(self._mm[start:start + length]) # Decode just this one line
 
     def _load_and_index_data(self) -> dict[str, dict[str, any]]:
         """Loads JSON data (assumed list of dicts) and indexes it by ticker."""
@@ -42,7 +153,7 @@ class YahooFinanceAdapter:
 
     def get_data(self, symbol: str) -> MarketDataPoint | None:
         """Retrieves data for a symbol and adapts it to MarketDataPoint."""
-        symbol_data = self._data_by_symbol.get(symbol)
+        symbol_data = self._lookup(symbol)
         if not symbol_data:
             print(f"Warning: Symbol '{symbol}' not found in Yahoo data.")
             return None
@@ -55,12 +166,94 @@ class YahooFinanceAdapter:
             print(f"Warning: Error processing symbol '{symbol}' in Yahoo data: {e}")
             return None
 
+    def get_many(self, symbols: list[str]) -> tuple[pd.DataFrame, list[str]]:
+        """Retrieves many symbols at once.
+
+        Returns (frame, missing): a DataFrame indexed by symbol (request order)
+        with 'price' and 'timestamp' (UTC) columns, and the symbols that were not
+        found. Nothing is printed per symbol; check the missing list instead.
+        """
+        found, prices, timestamps, missing = [], [], [], []
+        for symbol in dict.fromkeys(symbols): # Drop duplicates, keep order
+            symbol_data = self._lookup(symbol)
+            if not symbol_data or 'last_price' not in symbol_data or 'timestamp' not in symbol_data:
+                missing.append(symbol)
+                continue
+            found.append(symbol_data['ticker'])
+            prices.append(symbol_data['last_price'])
+            timestamps.append(symbol_data['timestamp']) # Raw strings, parsed together below
+        return _snapshot_frame(found, prices, timestamps), missing
+
+
+def iter_bloomberg_xml(filepath: str):
+    """Streams each <instrument> of a Bloomberg XML file as a MarketDataPoint.
+
+    Uses ET.iterparse, so the whole document is never held in memory: every
+    <instrument> is cleared as soon as it has been converted.
+    """
+    root = None # The first element we see (wrapper element, or the single <instrument>)
+    for event, elem in ET.iterparse(filepath, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            continue
+        if elem.tag != 'instrument':
+            continue # <symbol>/<price>/<timestamp> are read from their parent below
+        symbol = elem.findtext('symbol')
+        price = elem.findtext('price')
+        timestamp_str = elem.findtext('timestamp')
+        if symbol and price is not None and timestamp_str is not None:
+            try:
+                timestamp_dt = datetime.fromisoformat(timestamp_str.strip().replace('Z', '+00:00'))
+                yield MarketDataPoint(timestamp=timestamp_dt, symbol=symbol.strip(), price=float(price))
+            except ValueError as e:
+                print(f"Warning: Skipping instrument '{symbol}' in {filepath}: {e}")
+        else:
+            print(f"Warning: Skipping incomplete instrument element in {filepath}")
+        elem.clear() # Free the children of this <instrument>
+        if elem is not root:
+            root.clear() # And drop the empty <instrument> from the wrapper element
+
+
 class BloombergXMLAdapter:
-    """Adapts Bloomberg XML data format to MarketDataPoint objects."""
-    def __init__(self, filepath: str):
+    """Adapts Bloomberg XML data format to MarketDataPoint objects.
+
+    Modes:
+      "tree"   - parse the whole file and keep the <instrument> Elements (default)
+      "index"  - stream the file once, keep only symbol -> (price, timestamp)
+      "stream" - keep nothing; get_data scans the file, iter_data yields every point
+    """
+    MODES = ("tree", "index", "stream")
+
+    def __init__(self, filepath: str, mode: str = "tree"):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
         self.filepath = filepath
-        self._data_by_symbol: dict[str, ET.Element] = self._load_and_parse_data()
-        
+        self.mode = mode
+        self._data_by_symbol: dict[str, ET.Element] = {}
+        self._index: dict[str, tuple[float, datetime]] | None = None
+        if mode == "tree":
+            self._data_by_symbol = self._load_and_parse_data()
+        elif mode == "index":
+            self._index = self._build_index()
+
+    def _build_index(self) -> dict[str, tuple[float, datetime]]:
+        """Streams the XML once and stores parsed (price, timestamp) per symbol, no Elements."""
+        index = {}
+        try:
+            for point in iter_bloomberg_xml(self.filepath):
+                index[point.symbol] = (point.price, point.timestamp) # Last occurrence wins
+            print(f" -> Successfully indexed: {self.filepath} ({len(index)} symbols)")
+        except FileNotFoundError:
+            print(f"Error: Bloomberg XML file not found at {self.filepath}")
+        except ET.ParseError:
+            print(f"Error: Could not parse XML from {self.filepath}")
+        return index
+
+    def iter_data(self):
+        """Yields a MarketDataPoint for every instrument in the file, one at a time."""
+        return iter_bloomberg_xml(self.filepath)
+
     def _load_and_parse_data(self) -> dict[str, ET.Element]:
         """Loads and parses the XML file, indexing instrument elements by symbol."""
         indexed_data = {}
@@ -101,6 +294,24 @@ class BloombergXMLAdapter:
 
     def get_data(self, symbol: str) -> MarketDataPoint | None:
         """Retrieves data for a symbol and adapts it to MarketDataPoint."""
+        if self._index is not None:
+            # Index mode: values were parsed up front, no XML traversal here
+            hit = self._index.get(symbol)
+            if hit is None:
+                print(f"Warning: Symbol '{symbol}' not found in Bloomberg XML data.")
+                return None
+            return MarketDataPoint(timestamp=hit[1], symbol=symbol, price=hit[0])
+
+        if self.mode == "stream":
+            # Stream mode: scan the file, keeping only the last match
+            found = None
+            for point in self.iter_data():
+                if point.symbol == symbol:
+                    found = point
+            if found is None:
+                print(f"Warning: Symbol '{symbol}' not found in Bloomberg XML data.")
+            return found
+
         instrument_element = self._data_by_symbol.get(symbol) # Efficient lookup
 
         if instrument_element is None:
@@ -128,4 +339,29 @@ class BloombergXMLAdapter:
             return None
         except Exception as e: # Catch other potential errors like invalid timestamp
             print(f"Warning: Unexpected error processing symbol '{symbol}' in Bloomberg XML: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    def get_many(self, symbols: list[str]) -> tuple[pd.DataFrame, list[str]]:
+        """Retrieves many symbols at once (same result shape as YahooFinanceAdapter.get_many).
+
+        In "stream" mode the file is scanned only once for all requested symbols.
+        """
+        wanted = dict.fromkeys(symbols) # Drop duplicates, keep order
+        hits: dict[str, tuple] = {}
+        if self._index is not None:
+            hits = {symbol: self._index[symbol] for symbol in wanted if symbol in self._index}
+        elif self.mode == "stream":
+            for point in self.iter_data():
+                if point.symbol in wanted:
+                    hits[point.symbol] = (point.price, point.timestamp) # Last occurrence wins
+        else:
+            for symbol in wanted:
+                instrument_element = self._data_by_symbol.get(symbol)
+                if instrument_element is None:
+                    continue
+                price, timestamp_str = instrument_element.findtext('price'), instrument_element.findtext('timestamp')
+                if price is not None and timestamp_str is not None:
+                    hits[symbol] = (price, timestamp_str.strip()) # Raw text, converted together below
+        found = [symbol for symbol in wanted if symbol in hits]
+        missing = [symbol for symbol in wanted if symbol not in hits]
+        return _snapshot_frame(found, [hits[s][0] for s in found], [hits[s][1] for s in found]), missing
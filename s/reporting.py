@@ -2,6 +2,11 @@
 from patterns.observer import Observer
 import logging # We can use the logging module for the logger
 import datetime # To add timestamps to logs
+import atexit # To flush the batched logger on exit
+import queue
+import sys
+import threading
+import time
 from patterns.command import CommandInvoker, BuyOrderCommand, SellOrderCommand
 from portfolio import Portfolio
 
@@ -108,4 +113,154 @@ class OrderObserver(Observer):
             return 
             
         # 2. Tell the Invoker to execute the command
-        self.invoker.execute_command(command)
\ No newline at end of file
+        self.invoker.execute_command(command)
+
+class _BatchWriter:
+    """
+    Background thread that hands queued items to write_batch(batch) in batches.
+
+    A batch goes out every flush_interval seconds, or sooner once batch_size
+    items are waiting. If write_batch raises, a warning is printed and that
+    batch is dropped; the thread keeps running for later items.
+    """
+    def __init__(self, write_batch, flush_interval: float = 0.5, batch_size: int = 10000,
+                 name: str = 'batch-writer'):
+        self._write_batch = write_batch
+        self.flush_interval = flush_interval  # Max seconds an item waits before being written
+        self.batch_size = batch_size          # Write early once this many items are waiting
+        self.errors = 0                       # Number of batches that failed to write
+        self._queue = queue.SimpleQueue()
+        self._stop = object()
+        self.closed = False
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def put(self, item):
+        self._queue.put(item)
+
+    def _write(self, batch: list):
+        """Writes one batch; a failure is reported but never stops the thread."""
+        if not batch:
+            return
+        try:
+            self._write_batch(batch)
+        except Exception as e:
+            self.errors += 1
+            print(f"Warning: {self._thread.name} dropped {len(batch)} records: {e}")
+        batch.clear()
+
+    def _run(self):
+        """Background thread: collect items, write them in batches."""
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                item = None
+
+            if item is self._stop:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):  # A flush() request
+                self._write(batch)
+                item.set()
+            elif item is not None:
+                batch.append(item)
+                if len(batch) < self.batch_size and time.monotonic() < deadline:
+                    continue
+                self._write(batch)
+            else:
+                self._write(batch)  # flush_interval passed
+            deadline = time.monotonic() + self.flush_interval
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Waits until every item queued so far has been written.
+        Returns False on timeout, or if the writer is closed or not running.
+        """
+        if self.closed or not self._thread.is_alive():
+            return False
+        done = threading.Event()
+        self._queue.put(done)
+        end = None if timeout is None else time.monotonic() + timeout
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                return False  # Writer died; don't wait forever
+            if end is not None and time.monotonic() >= end:
+                return False
+        return True
+
+    def close(self, timeout: float | None = None):
+        """Writes anything still queued and stops the thread."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(self._stop)
+        self._thread.join(timeout)
+
+
+class BatchedLoggerObserver(Observer):
+    """
+    A faster LoggerObserver for high-signal days.
+
+    update() does no formatting and no I/O: it just puts a raw tuple on a
+    queue (the same idea as logging's QueueHandler). A _BatchWriter thread
+    formats whole batches and writes them to the log file (and, optionally,
+    the console) in one large write. A failed write is reported and skipped.
+    """
+    def __init__(self, filename: str = 'trade_signals.log', echo: bool = True,
+                 flush_interval: float = 0.5, batch_size: int = 10000):
+        self.filename = filename
+        self.echo = echo  # Also print to console, like LoggerObserver
+        self._writer = _BatchWriter(self._write_batch, flush_interval, batch_size, name='batched-logger')
+        # Make sure nothing is lost if the program exits without calling close()
+        atexit.register(self.close)
+
+    def update(self, signal: dict):
+        """
+        Receives signal update and queues it for the background writer.
+        """
+        self._writer.put((
+            time.time(),
+            signal.get('timestamp'),
+            signal.get('strategy'),
+            signal.get('symbol'),
+            signal.get('signal'),
+            signal.get('price'),
+        ))
+
+    def _write_batch(self, batch: list):
+        """Formats a whole batch and writes it in one go."""
+        lines = []
+        for logged_at, ts, strategy, symbol, action, price in batch:
+            lines.append(
+                f"SIGNAL LOG: "
+                f"Time={ts}, "
+                f"Strategy={strategy}, "
+                f"Symbol={symbol}, "
+                f"Signal={action}, "
+                f"Price={price}"
+            )
+        try:
+            with open(self.filename, 'a') as f:
+                f.write("".join(
+                    f"{datetime.datetime.fromtimestamp(item[0]):%Y-%m-%d %H:%M:%S} - {line}\n"
+                    for item, line in zip(batch, lines)
+                ))
+        except PermissionError:
+            print(f"Warning: No permission to write to '{self.filename}'.")
+        if self.echo:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Waits until every signal queued so far has been written (False on timeout or dead writer)."""
+        return self._writer.flush(timeout)
+
+    def close(self):
+        """Writes anything still queued and stops the writer thread."""
+        if self._writer.closed:
+            return
+        self._writer.close()
+        atexit.unregister(self.close)